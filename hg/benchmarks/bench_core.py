@@ -0,0 +1,56 @@
+import pytest
+
+from hg.core.world import World
+from hg.game.components.body_component import BodyComponent
+from hg.game.components.position_component import PositionComponent
+from hg.game.components.sprite_component import SpriteComponent
+
+
+def populate(w: World, count: int):
+    # a mix of archetypes, a half of the entities having a position
+    for i in range(count):
+        if i % 2:
+            w.add_entity(components=(PositionComponent(), SpriteComponent()))
+        else:
+            w.add_entity(components=(SpriteComponent(),))
+
+
+@pytest.fixture(scope='module', params=[1000, 10000, 100000], ids=['1k', '10k', '100k'])
+def populated_world(request):
+    w = World()
+    populate(w, request.param)
+    return w
+
+
+def test_add_del_entities(benchmark):
+    w = World()
+
+    def add_del():
+        entities = [w.add_entity(components=(PositionComponent(), BodyComponent())) for _ in range(1000)]
+        for entity in entities:
+            w.del_entity(entity)
+
+    benchmark(add_del)
+
+
+def test_add_del_entities_batch(benchmark):
+    w = World()
+
+    def add_del():
+        w.del_entities(w.add_entities((PositionComponent(), BodyComponent()) for _ in range(1000)))
+
+    benchmark(add_del)
+
+
+def test_query_entities(benchmark, populated_world):
+    def query():
+        return sum(1 for _ in populated_world.query_entities(lambda e: PositionComponent in e))
+
+    assert benchmark(query) == len(populated_world.query(PositionComponent))
+
+
+def test_query_view(benchmark, populated_world):
+    def query():
+        return sum(1 for _ in populated_world.query(PositionComponent, SpriteComponent))
+
+    assert benchmark(query) > 0
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from hg.core.system import SystemRegistry
+from hg.core.world import World
+from hg.game.components.body_component import BodyComponent
+from hg.game.components.position_component import PositionComponent
+from hg.game.components.sprite_component import SpriteComponent
+from hg.game.settings import Settings
+from hg.game.systems.physics_system import PhysicsSystem
+from hg.game.systems.sprite_render_system import SpriteRenderSystem
+from hg.res.loaders.sprite_loader import SpriteLoader
+
+RES_DIR = os.path.join(os.path.dirname(__file__), '..', 'res', 'loaders', 'tests')
+
+
+@pytest.fixture
+def inject_config(inject_config):
+    # bodies never come to rest in free fall, so every tick costs the same
+    return {
+        **inject_config,
+        Settings: lambda: Settings(sleep_enabled=False),
+    }
+
+
+@pytest.mark.inject()
+@pytest.mark.parametrize('options', [{}, {'batched': True}, {'batched': True, 'cell_size': 64}],
+                         ids=['entity', 'batched', 'collisions'])
+def test_physics_tick(benchmark, options):
+    w = World()
+    sysreg = SystemRegistry(w)
+    system = PhysicsSystem(**options)
+    sysreg.register_system(system)
+    for i in range(1000):
+        w.add_entity(components=(PositionComponent(i * 10, 0), BodyComponent()))
+
+    benchmark(system.tick, w)
+
+
+@pytest.mark.inject()
+def test_sprite_render_tick(benchmark):
+    w = World()
+    sysreg = SystemRegistry(w)
+    system = SpriteRenderSystem()
+    sysreg.register_system(system)
+    resource = os.path.join(RES_DIR, 'test_sprite_0.xml')
+    entities = w.add_entities([(PositionComponent(i, i), SpriteComponent(resource=resource)) for i in range(1000)])
+
+    # the sprites are loaded on the first tick, measure the following ones
+    # with all the sprites moving, as only changed positions are synced
+    system.tick(w)
+
+    def move():
+        for entity in entities:
+            entity[PositionComponent].x += 1
+
+    benchmark.pedantic(system.tick, (w,), setup=move, rounds=200)
+
+
+@pytest.mark.inject()
+def test_sprite_loading(benchmark):
+    loader = SpriteLoader()
+    sprite = benchmark(loader.load, os.path.join(RES_DIR, 'test_sprite_0.xml'))
+    assert sprite.frames
@@ -0,0 +1,68 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Tuple
+
+
+class Archetype:
+    """
+    Table of all entities sharing the exact same set of component types.
+
+    Components are stored column-wise, one list per component type, with the
+    entity at row `i` owning the `i`-th element of every column.
+    """
+
+    def __init__(self, types: Tuple[type, ...]):
+        self.types = types
+        self.signature: FrozenSet[type] = frozenset(types)
+        self.entities: List[Any] = []
+        self.columns: Dict[type, List[Any]] = {comp_type: [] for comp_type in types}
+
+        # archetype graph edges, i.e. the archetypes an entity moves to when a
+        # component of given type is added or deleted
+        self.add_edges: Dict[type, 'Archetype'] = {}
+        self.del_edges: Dict[type, 'Archetype'] = {}
+
+        self.__rows: Dict[int, int] = {}
+
+    def matches(self, comp_types: Iterable[type]) -> bool:
+        return self.signature.issuperset(comp_types)
+
+    def get(self, uid: int, comp_type: type) -> Any:
+        return self.columns[comp_type][self.__rows[uid]]
+
+    def components(self, uid: int) -> Dict[type, Any]:
+        row = self.__rows[uid]
+        return {comp_type: column[row] for comp_type, column in self.columns.items()}
+
+    def append(self, entity, components: Mapping[type, Any]):
+        self.__rows[entity.uid] = len(self.entities)
+        self.entities.append(entity)
+        for comp_type, column in self.columns.items():
+            column.append(components[comp_type])
+
+    def remove(self, uid: int) -> Dict[type, Any]:
+        # swap the last row into the removed one, keeping the columns dense
+        row = self.__rows.pop(uid)
+        last = len(self.entities) - 1
+
+        removed = {}
+        for comp_type, column in self.columns.items():
+            removed[comp_type] = column[row]
+            column[row] = column[last]
+            column.pop()
+
+        moved = self.entities[last]
+        self.entities[row] = moved
+        self.entities.pop()
+        if row != last:
+            self.__rows[moved.uid] = row
+
+        return removed
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __contains__(self, uid: int) -> bool:
+        return uid in self.__rows
+
+    def __repr__(self) -> str:
+        names = ', '.join(comp_type.__name__ for comp_type in self.types)
+        return f'Archetype(types=({names}), size={len(self.entities)})'
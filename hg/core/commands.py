@@ -0,0 +1,66 @@
+from itertools import groupby
+from typing import Any, List, Sequence, Tuple, Union
+
+ADD_ENTITY = 0
+DEL_ENTITY = 1
+ADD_COMPONENT = 2
+DEL_COMPONENT = 3
+
+
+class CommandBuffer:
+    """
+    Recorder of structural world changes, applied later in a single flush.
+
+    Consecutive entity additions and deletions are applied in bulk through
+    the world's batch APIs, commands targeting entities which are gone by the
+    time of the flush are skipped.
+    """
+
+    def __init__(self):
+        self.__commands: List[Tuple[int, Any, Any]] = []
+
+    def add_entity(self, name: str = '', components: Sequence = ()):
+        self.__commands.append((ADD_ENTITY, name, tuple(components)))
+
+    def del_entity(self, entity: Union[Any, int]):
+        self.__commands.append((DEL_ENTITY, self.__uid(entity), None))
+
+    def add_component(self, entity: Union[Any, int], comp: Any):
+        self.__commands.append((ADD_COMPONENT, self.__uid(entity), comp))
+
+    def del_component(self, entity: Union[Any, int], comp_type: type):
+        self.__commands.append((DEL_COMPONENT, self.__uid(entity), comp_type))
+
+    def clear(self):
+        self.__commands.clear()
+
+    def flush(self, world):
+        # swap the buffer out first, so that commands issued by listeners
+        # during the flush are recorded for the next one
+        commands, self.__commands = self.__commands, []
+
+        for (op, name), run in groupby(commands, key=self.__run_key):
+            if op == ADD_ENTITY:
+                world.add_entities([components for _, _, components in run], name=name)
+            elif op == DEL_ENTITY:
+                world.del_entities([uid for _, uid, _ in run if world.is_alive(uid)])
+            else:
+                for _, uid, arg in run:
+                    if not world.is_alive(uid):
+                        continue
+                    if op == ADD_COMPONENT:
+                        world[uid].add_component(arg)
+                    else:
+                        world[uid].del_component(arg)
+
+    def __len__(self) -> int:
+        return len(self.__commands)
+
+    @staticmethod
+    def __run_key(command: Tuple[int, Any, Any]) -> Tuple[int, Any]:
+        op, arg, _ = command
+        return (op, arg if op == ADD_ENTITY else None)
+
+    @staticmethod
+    def __uid(entity: Union[Any, int]) -> int:
+        return entity if isinstance(entity, int) else entity.uid
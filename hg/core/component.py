@@ -0,0 +1,25 @@
+from typing import Any, List, Optional
+
+
+class TrackedComponent:
+    """
+    Base class of components whose changes are stamped automatically.
+
+    While the component belongs to an entity, assigning any of its attributes
+    marks it as changed, as `World.mark_changed` would; changes made in place
+    to mutable attribute values still have to be marked explicitly. Pooled
+    tracked components get views tracking their field writes the same way.
+    """
+
+    # list the component reports its writes to while it belongs to an entity,
+    # at most once until the world collects them, and the uid of the entity
+    _world_writes: Optional[List[Any]] = None
+    _uid = 0
+    _written = False
+
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+        writes = self._world_writes
+        if writes is not None and not self._written:
+            object.__setattr__(self, '_written', True)
+            writes.append(self)
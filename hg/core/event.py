@@ -1,19 +1,126 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+Listener = Callable[..., Any]
+
+
 class Event:
+    """
+    Notification dispatched to a set of subscribed listeners.
 
-    def __init__(self, name):
+    Events created with a key function also accept listeners subscribed to
+    some keys only, which are called just for the notifications whose
+    arguments map to one of them.
+
+    Queued events don't notify anyone when called, their arguments are
+    buffered instead and delivered on flush. Batch listeners receive all the
+    buffered argument tuples in a single call, while regular listeners are
+    still called once per notification.
+    """
+
+    def __init__(self, name, key: Optional[Callable[..., Hashable]] = None, queued: bool = False):
         self.name = name
-        self.__listeners = []
+        self.__key = key
+        self.__queued = queued
+        self.__queue: List[Tuple[Any, ...]] = []
+        self.__listeners: Dict[Listener, None] = {}
+        self.__keyed: Dict[Hashable, Dict[Listener, None]] = {}
+        self.__batch_listeners: Dict[Listener, None] = {}
+
+        # listeners are called from snapshots, which are rebuilt on
+        # subscription changes only, so that listeners can unsubscribe
+        # themselves while being called
+        self.__snapshot: Tuple[Listener, ...] = ()
+        self.__keyed_snapshots: Dict[Hashable, Tuple[Listener, ...]] = {}
+        self.__batch_snapshot: Tuple[Listener, ...] = ()
+
+    @property
+    def queued(self) -> bool:
+        return self.__queued
+
+    @queued.setter
+    def queued(self, value: bool):
+        self.__queued = value
+        if not value:
+            self.flush()
+
+    @property
+    def pending(self) -> int:
+        return len(self.__queue)
 
     def __iadd__(self, listener):
-        if listener not in self.__listeners:
-            self.__listeners.append(listener)
+        self.subscribe(listener)
         return self
 
     def __isub__(self, listener):
-        if listener in self.__listeners:
-            self.__listeners.remove(listener)
+        self.unsubscribe(listener)
         return self
 
+    def subscribe(self, listener: Listener, keys: Optional[Iterable[Hashable]] = None):
+        if keys is None:
+            self.__listeners[listener] = None
+            self.__snapshot = tuple(self.__listeners)
+            return
+
+        if self.__key is None:
+            raise ValueError(f'Event "{self.name}" has no key function to subscribe by keys')
+
+        for key in keys:
+            listeners = self.__keyed.setdefault(key, {})
+            listeners[listener] = None
+            self.__keyed_snapshots[key] = tuple(listeners)
+
+    def unsubscribe(self, listener: Listener, keys: Optional[Iterable[Hashable]] = None):
+        if keys is None:
+            if self.__listeners.pop(listener, False) is None:
+                self.__snapshot = tuple(self.__listeners)
+            return
+
+        for key in keys:
+            listeners = self.__keyed.get(key)
+            if listeners is None or listeners.pop(listener, False) is not None:
+                continue
+            if listeners:
+                self.__keyed_snapshots[key] = tuple(listeners)
+            else:
+                del self.__keyed[key]
+                del self.__keyed_snapshots[key]
+
+    def subscribe_batch(self, listener: Callable[[List[Tuple[Any, ...]]], Any]):
+        self.__batch_listeners[listener] = None
+        self.__batch_snapshot = tuple(self.__batch_listeners)
+
+    def unsubscribe_batch(self, listener: Callable[[List[Tuple[Any, ...]]], Any]):
+        if self.__batch_listeners.pop(listener, False) is None:
+            self.__batch_snapshot = tuple(self.__batch_listeners)
+
+    def flush(self):
+        if not self.__queue:
+            return
+
+        # swap the queue out first, so that notifications sent by listeners
+        # are delivered on the next flush
+        queue, self.__queue = self.__queue, []
+        if self.__snapshot or self.__keyed_snapshots:
+            for args in queue:
+                self.__notify(args, {})
+        for listener in self.__batch_snapshot:
+            listener(queue)
+
     def __call__(self, *args, **kwargs):
-        for listener in self.__listeners:
+        if self.__queued:
+            if kwargs:
+                raise TypeError(f'Queued event "{self.name}" takes positional arguments only')
+            self.__queue.append(args)
+            return
+
+        self.__notify(args, kwargs)
+        for listener in self.__batch_snapshot:
+            listener([args])
+
+    def __notify(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]):
+        for listener in self.__snapshot:
             listener(*args, **kwargs)
+
+        if self.__keyed_snapshots:
+            for listener in self.__keyed_snapshots.get(self.__key(*args, **kwargs), ()):  # type: ignore
+                listener(*args, **kwargs)
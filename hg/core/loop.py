@@ -0,0 +1,65 @@
+import time
+from typing import Callable, Optional
+
+from .system import SystemRegistry
+
+
+class FixedStepLoop:
+    """
+    Drives a system registry at a fixed time step, decoupled from the frame
+    rate.
+
+    Each frame the elapsed real time is accumulated and consumed in whole
+    steps, at most `max_steps` of them: when a frame stalls for longer, the
+    excess time is dropped instead of being caught up, so that a slow frame
+    can't snowball into ever slower ones. The fraction of a step left over is
+    exposed as `alpha`, for rendering in between the last two ticked states.
+    """
+
+    def __init__(
+            self,
+            systems: SystemRegistry,
+            time_step: float,
+            max_steps: int = 5,
+            clock: Callable[[], float] = time.perf_counter):
+        self.time_step = time_step
+        self.max_steps = max_steps
+        self.ticks = 0
+        self.dropped_ticks = 0
+
+        self.__systems = systems
+        self.__clock = clock
+        self.__last_time: Optional[float] = None
+        self.__time_acc = 0.0
+
+    @property
+    def alpha(self) -> float:
+        return self.__time_acc / self.time_step
+
+    def update(self) -> int:
+        now = self.__clock()
+        elapsed = 0.0 if self.__last_time is None else now - self.__last_time
+        self.__last_time = now
+        return self.advance(elapsed)
+
+    def advance(self, elapsed: float) -> int:
+        self.__time_acc += elapsed
+
+        steps = 0
+        while self.__time_acc >= self.time_step and steps < self.max_steps:
+            self.__time_acc -= self.time_step
+            self.__systems.tick_all()
+            steps += 1
+
+        # drop the whole steps exceeding the cap, keeping just the remainder
+        if self.__time_acc >= self.time_step:
+            dropped = int(self.__time_acc // self.time_step)
+            self.__time_acc -= dropped * self.time_step
+            self.dropped_ticks += dropped
+
+        self.ticks += steps
+        return steps
+
+    def reset(self):
+        self.__last_time = None
+        self.__time_acc = 0.0
@@ -0,0 +1,178 @@
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from .component import TrackedComponent
+
+DEFAULT_DTYPES = {
+    float: np.float64,
+    int: np.int64,
+    bool: np.bool_,
+    'float': np.float64,
+    'int': np.int64,
+    'bool': np.bool_,
+}
+
+CONVERTERS: Dict[Any, Callable[[Any], Any]] = {
+    np.dtype(np.float64): float,
+    np.dtype(np.float32): float,
+    np.dtype(np.int64): int,
+    np.dtype(np.int32): int,
+    np.dtype(np.bool_): bool,
+}
+
+
+class ComponentView:
+    """
+    Base class of lightweight proxies handed out by component pools.
+
+    A view has no per-instance dictionary, just a reference to its pool and a
+    slot index, and all of its fields are read from and written to the pool
+    columns.
+    """
+
+    __slots__ = ('_pool', '_slot')
+
+    @property
+    def pool(self) -> 'ComponentPool':
+        return self._pool
+
+    @property
+    def slot(self) -> int:
+        return self._slot
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ComponentView):
+            if other._pool.comp_type is not self._pool.comp_type:
+                return NotImplemented
+        elif type(other) is not self._pool.comp_type:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._pool.field_names)
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._pool.field_names)
+        return f'{type(self).__name__}({values})'
+
+
+class TrackedView(ComponentView):
+    """
+    View of a pooled tracked component, reporting its field writes like the
+    component itself would.
+    """
+
+    __slots__ = ('_world_writes', '_uid', '_written')
+
+
+def component_type(comp: Any) -> type:
+    return comp._pool.comp_type if isinstance(comp, ComponentView) else type(comp)
+
+
+def make_field_property(name: str, convert: Optional[Callable[[Any], Any]], tracked: bool = False) -> property:
+    if convert is None:
+        def getter(view):
+            return view._pool.columns[name][view._slot]
+    else:
+        def getter(view):
+            return convert(view._pool.columns[name][view._slot])
+
+    if tracked:
+        def setter(view, value):
+            view._pool.columns[name][view._slot] = value
+            writes = view._world_writes
+            if writes is not None and not view._written:
+                view._written = True
+                writes.append(view)
+    else:
+        def setter(view, value):
+            view._pool.columns[name][view._slot] = value
+
+    return property(getter, setter)
+
+
+class ComponentPool:
+    """
+    Structure-of-arrays storage for instances of a dataclass component.
+
+    Each field of the component is kept in its own typed NumPy column, fields
+    of unsupported types fall back to object columns.
+    """
+
+    def __init__(self, comp_type: type, capacity: int = 1024, dtypes: Mapping[str, Any] = None):
+        if not is_dataclass(comp_type):
+            raise TypeError(f'"{comp_type.__name__}" is not a dataclass')
+
+        self.comp_type = comp_type
+        self.field_names = tuple(f.name for f in fields(comp_type))
+        self.columns: Dict[str, np.ndarray] = {}
+
+        dtypes = dtypes or {}
+        for f in fields(comp_type):
+            dtype = dtypes.get(f.name, DEFAULT_DTYPES.get(f.type, object))
+            self.columns[f.name] = np.zeros(capacity, dtype=dtype)
+
+        self.alive = np.zeros(capacity, dtype=np.bool_)
+        self.tracked = issubclass(comp_type, TrackedComponent)
+        self.view_type = type(f'{comp_type.__name__}View', (TrackedView if self.tracked else ComponentView,), {
+            '__slots__': (),
+            **{
+                name: make_field_property(name, CONVERTERS.get(column.dtype), self.tracked)
+                for name, column in self.columns.items()
+            },
+        })
+
+        self.__free: List[int] = []
+        self.__size = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.alive)
+
+    def alloc(self, comp: Any) -> ComponentView:
+        if type(comp) is not self.comp_type:
+            raise TypeError(f'Expected a "{self.comp_type.__name__}" instance, got "{type(comp).__name__}"')
+
+        if self.__free:
+            slot = self.__free.pop()
+        else:
+            slot = self.__size
+            if slot == self.capacity:
+                self.__grow(2 * slot)
+            self.__size += 1
+
+        for name, column in self.columns.items():
+            column[slot] = getattr(comp, name)
+        self.alive[slot] = True
+
+        view = object.__new__(self.view_type)
+        view._pool = self
+        view._slot = slot
+        if self.tracked:
+            view._world_writes = None
+            view._uid = 0
+            view._written = False
+        return view
+
+    def free(self, view: ComponentView) -> Any:
+        # materialize the values into a standalone component, since the slot
+        # will be reused by the next allocation
+        comp = self.comp_type(**{name: getattr(view, name) for name in self.field_names})
+        self.alive[view._slot] = False
+        self.__free.append(view._slot)
+        return comp
+
+    def slots(self, views: Iterable[ComponentView]) -> np.ndarray:
+        return np.fromiter((view._slot for view in views), dtype=np.int64)
+
+    def __grow(self, capacity: int):
+        for name, column in self.columns.items():
+            new = np.zeros(capacity, dtype=column.dtype)
+            new[:len(column)] = column
+            self.columns[name] = new
+
+        alive = np.zeros(capacity, dtype=np.bool_)
+        alive[:len(self.alive)] = self.alive
+        self.alive = alive
+
+    def __len__(self) -> int:
+        return self.__size - len(self.__free)
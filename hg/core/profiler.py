@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+from collections import deque
+from time import perf_counter_ns
+from typing import Any, Callable, Deque, Dict, List, NamedTuple
+
+
+class Sample(NamedTuple):
+
+    frame: int
+    name: str
+    thread: int
+    start: int
+    duration: int
+    entities: int
+    events: int
+
+
+class Stats(NamedTuple):
+
+    count: int
+    total: int
+    mean: float
+    max: int
+
+
+class Profiler:
+    """
+    Recorder of system tick timings into a ring buffer of the most recent
+    samples.
+
+    Besides its duration in nanoseconds, each sample records the number of
+    entities the system declared to access and the number of world event
+    notifications fanned out to systems while it ran.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.samples: Deque[Sample] = deque(maxlen=capacity)
+        self.frame = 0
+        self.__local = threading.local()
+
+    def measure(self, name: str, entities: int, func: Callable[..., Any], *args: Any) -> Any:
+        local = self.__local
+        outer = getattr(local, 'events', None)
+        local.events = 0
+        start = perf_counter_ns()
+        try:
+            return func(*args)
+        finally:
+            duration = perf_counter_ns() - start
+            events = local.events
+            local.events = outer
+            self.samples.append(
+                Sample(self.frame, name, threading.get_ident(), start, duration, entities, events))
+
+    def count_events(self, fan_out: int):
+        # only events fired while measuring are attributed to anything
+        local = self.__local
+        if getattr(local, 'events', None) is not None:
+            local.events += fan_out
+
+    def stats(self) -> Dict[str, Stats]:
+        durations: Dict[str, List[int]] = {}
+        for sample in self.samples:
+            durations.setdefault(sample.name, []).append(sample.duration)
+        return {
+            name: Stats(len(values), sum(values), sum(values) / len(values), max(values))
+            for name, values in durations.items()
+        }
+
+    def clear(self):
+        self.samples.clear()
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        return {
+            'traceEvents': [
+                {
+                    'name': sample.name,
+                    'cat': 'system',
+                    'ph': 'X',
+                    'ts': sample.start / 1000,
+                    'dur': sample.duration / 1000,
+                    'pid': pid,
+                    'tid': sample.thread,
+                    'args': {
+                        'frame': sample.frame,
+                        'entities': sample.entities,
+                        'events': sample.events,
+                    },
+                }
+                for sample in self.samples
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def dump_chrome_trace(self, path: str):
+        with open(path, 'w') as fo:
+            json.dump(self.chrome_trace(), fo)
@@ -0,0 +1,54 @@
+from typing import Any, Dict, Iterator, KeysView, Tuple, Union
+
+
+class Query:
+    """
+    Live view of all entities having a given set of component types.
+
+    The view is kept up to date from world's component events, so reading it
+    costs proportionally to the number of matched entities only.
+    """
+
+    def __init__(self, world, comp_types: Tuple[type, ...]):
+        self.comp_types = comp_types
+        self.__entities: Dict[int, Any] = {}
+
+        for entity in world.entities_with(*comp_types):
+            self.__entities[entity.uid] = entity
+
+        world.on_entity_component_add.subscribe(self.__on_entity_comp_add, comp_types)
+        world.on_entity_component_del.subscribe(self.__on_entity_comp_del, comp_types)
+        world.on_entities_add += self.__on_entities_add
+        world.on_entities_del += self.__on_entities_del
+
+    @property
+    def uids(self) -> KeysView[int]:
+        return self.__entities.keys()
+
+    def __iter__(self) -> Iterator[Any]:
+        # iterate over a snapshot, so that entities can be safely deleted
+        # while the query is being traversed
+        return iter(tuple(self.__entities.values()))
+
+    def __len__(self) -> int:
+        return len(self.__entities)
+
+    def __contains__(self, entity: Union[Any, int]) -> bool:
+        uid = entity if isinstance(entity, int) else entity.uid
+        return uid in self.__entities
+
+    def __on_entity_comp_add(self, entity, comp):
+        if entity.has_components(*self.comp_types):
+            self.__entities[entity.uid] = entity
+
+    def __on_entity_comp_del(self, entity, comp):
+        self.__entities.pop(entity.uid, None)
+
+    def __on_entities_add(self, entities):
+        for entity in entities:
+            if entity.has_components(*self.comp_types):
+                self.__entities[entity.uid] = entity
+
+    def __on_entities_del(self, entities):
+        for entity in entities:
+            self.__entities.pop(entity.uid, None)
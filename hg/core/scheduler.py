@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .system import System
+from .world import World
+
+
+def tick_system(system: System, world: World):
+    system.tick(world)
+
+
+def conflicts(a: System, b: System) -> bool:
+    if a.main_thread or b.main_thread:
+        return True
+    if a.reads is None or a.writes is None or b.reads is None or b.writes is None:
+        return True
+
+    a_writes = set(a.writes)
+    b_writes = set(b.writes)
+    return bool(
+        a_writes.intersection(b.reads) or
+        a_writes.intersection(b_writes) or
+        b_writes.intersection(a.reads))
+
+
+def build_stages(systems: Sequence[System]) -> List[List[System]]:
+    """
+    Split the systems into stages of mutually non-conflicting ones.
+
+    Each system is placed in the stage after the last one containing a
+    conflicting system registered before it, so that conflicting systems
+    always tick in registration order.
+    """
+    levels: List[int] = []
+    stages: List[List[System]] = []
+    for i, system in enumerate(systems):
+        level = 0
+        for j in range(i):
+            if levels[j] >= level and conflicts(systems[j], system):
+                level = levels[j] + 1
+        levels.append(level)
+
+        if level == len(stages):
+            stages.append([])
+        stages[level].append(system)
+
+    return stages
+
+
+class Scheduler:
+    """
+    Runs system ticks concurrently on a thread pool, according to the
+    component types each system declared to read and write.
+
+    Systems within a stage tick in parallel, which pays off for systems doing
+    their work in NumPy or other code releasing the GIL. Systems with
+    undeclared accesses or requiring the main thread get stages of their own,
+    ticked on the thread calling `run`. Structural world changes issued by
+    concurrently ticking systems must go through the world's command buffer.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hg-system')
+        self.__systems: Tuple[System, ...] = ()
+        self.__stages: List[List[System]] = []
+
+    def stages(self, systems: Sequence[System]) -> List[List[System]]:
+        systems = tuple(systems)
+        if systems != self.__systems:
+            self.__systems = systems
+            self.__stages = build_stages(systems)
+        return self.__stages
+
+    def run(self, systems: Sequence[System], world: World, tick: Optional[Callable[[System, World], None]] = None):
+        tick = tick or tick_system
+        for stage in self.stages(systems):
+            if len(stage) == 1:
+                tick(stage[0], world)
+                continue
+
+            futures = [self.__executor.submit(tick, system, world) for system in stage]
+            for future in futures:
+                future.result()
+
+    def shutdown(self):
+        self.__executor.shutdown()
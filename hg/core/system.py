@@ -1,15 +1,52 @@
 from abc import ABCMeta, abstractmethod
-from typing import Any, List
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
+from .pool import component_type
 from .world import Entity, World
 
+if TYPE_CHECKING:
+    from .profiler import Profiler  # noqa: F401
+    from .scheduler import Scheduler  # noqa: F401
+
 
 class System(metaclass=ABCMeta):
 
+    # component types accessed by the system during its tick, used for
+    # scheduling it concurrently with other systems; None means unknown, in
+    # which case the system never runs alongside others
+    reads: Optional[Tuple[type, ...]] = None
+    writes: Optional[Tuple[type, ...]] = None
+
+    # component types whose additions and deletions the system is notified
+    # about; None means the ones it reads or writes, or all of them if those
+    # aren't declared either
+    watches: Optional[Tuple[type, ...]] = None
+
+    # whether the system must tick on the thread running the systems, for
+    # instance because it uses a graphics context; such systems never run
+    # alongside others
+    main_thread = False
+
+    # whether the system takes part in simulating the world, as opposed to
+    # just presenting it; systems which don't are skipped when running headless
+    headless = True
+
     @abstractmethod
     def tick(self, world: World):
         raise NotImplementedError
 
+    def watched_types(self) -> Optional[FrozenSet[type]]:
+        if self.watches is not None:
+            return frozenset(self.watches)
+        if self.reads is None or self.writes is None:
+            return None
+        return frozenset(self.reads + self.writes)
+
+    def close(self):
+        # releases the resources held by the system, called once it's
+        # unregistered or its registry is closed
+        pass
+
     def on_entity_added(self, entity: Entity):
         pass
 
@@ -22,40 +59,133 @@ class System(metaclass=ABCMeta):
     def on_entity_component_deleted(self, entity: Entity, comp: Any):
         pass
 
+    def on_entities_added(self, entities: Sequence[Entity]):
+        watched = self.watched_types()
+        for entity in entities:
+            self.on_entity_added(entity)
+            for comp_type, comp in entity.components.items():
+                if watched is None or comp_type in watched:
+                    self.on_entity_component_added(entity, comp)
+
+    def on_entities_deleted(self, entities: Sequence[Entity]):
+        watched = self.watched_types()
+        for entity in entities:
+            for comp_type, comp in entity.components.items():
+                if watched is None or comp_type in watched:
+                    self.on_entity_component_deleted(entity, comp)
+            self.on_entity_deleted(entity)
+
 
 class SystemRegistry:
 
-    def __init__(self, world: World):
+    def __init__(self, world: World, scheduler: Optional['Scheduler'] = None, profiler: Optional['Profiler'] = None):
         self.__world = world
         self.__systems: List[System] = []
+        self.__scheduler = scheduler
+
+        # systems to notify about component changes, by component type
+        self.__watchers: Dict[type, Tuple[System, ...]] = {}
+
+        # profiling can be toggled at any time by setting or unsetting the
+        # profiler, without it ticks aren't instrumented at all
+        self.profiler = profiler
 
         world.on_entity_add += self.__on_entity_add
         world.on_entity_del += self.__on_entity_del
         world.on_entity_component_add += self.__on_entity_comp_add
         world.on_entity_component_del += self.__on_entity_comp_del
+        world.on_entities_add += self.__on_entities_add
+        world.on_entities_del += self.__on_entities_del
 
     def register_system(self, system: System):
         self.__systems.append(system)
+        self.__watchers.clear()
 
     def unregister_system(self, system: System):
         self.__systems.remove(system)
+        system.close()
+        self.__watchers.clear()
+
+    def close(self):
+        # close the systems in the reverse order of their registration
+        for system in reversed(list(self.__systems)):
+            self.unregister_system(system)
 
     def tick_all(self):
-        for system in self.__systems:
-            system.tick(self.__world)
+        if self.profiler is not None:
+            self.__tick_all_profiled(self.profiler)
+            return
+
+        if self.__scheduler is not None:
+            self.__scheduler.run(self.__systems, self.__world)
+        else:
+            for system in self.__systems:
+                system.tick(self.__world)
+
+        # apply the structural changes deferred by systems during the tick and
+        # deliver the notifications queued meanwhile
+        self.__world.flush_commands()
+        self.__world.flush_events()
+
+    def __tick_all_profiled(self, profiler: 'Profiler'):
+        if self.__scheduler is not None:
+            self.__scheduler.run(self.__systems, self.__world, tick=self.__tick_profiled)
+        else:
+            for system in self.__systems:
+                self.__tick_profiled(system, self.__world)
+
+        profiler.measure('flush_commands', len(self.__world.commands), self.__world.flush_commands)
+        profiler.measure('flush_events', 0, self.__world.flush_events)
+        profiler.frame += 1
+
+    def __tick_profiled(self, system: System, world: World):
+        # entities accessed by the system, as far as it declared them; counted
+        # from the archetypes, as live queries would be kept forever
+        types = tuple(dict.fromkeys((system.reads or ()) + (system.writes or ())))
+        entities = sum(len(archetype) for archetype in world.query_archetypes(*types)) if types else 0
+        self.profiler.measure(type(system).__name__, entities, system.tick, world)
+
+    def __watchers_of(self, comp: Any) -> Tuple[System, ...]:
+        comp_type = component_type(comp)
+        watchers = self.__watchers.get(comp_type)
+        if watchers is None:
+            watchers = self.__watchers[comp_type] = tuple(
+                system for system in self.__systems
+                if system.watched_types() is None or comp_type in system.watched_types())
+        return watchers
+
+    def __count_events(self, fan_out: int):
+        if self.profiler is not None:
+            self.profiler.count_events(fan_out)
 
     def __on_entity_add(self, entity):
+        self.__count_events(len(self.__systems))
         for system in self.__systems:
             system.on_entity_added(entity)
 
     def __on_entity_del(self, entity):
+        self.__count_events(len(self.__systems))
         for system in self.__systems:
             system.on_entity_deleted(entity)
 
     def __on_entity_comp_add(self, entity, comp):
-        for system in self.__systems:
+        watchers = self.__watchers_of(comp)
+        self.__count_events(len(watchers))
+        for system in watchers:
             system.on_entity_component_added(entity, comp)
 
     def __on_entity_comp_del(self, entity, comp):
-        for system in self.__systems:
+        watchers = self.__watchers_of(comp)
+        self.__count_events(len(watchers))
+        for system in watchers:
             system.on_entity_component_deleted(entity, comp)
+
+    def __on_entities_add(self, entities):
+        self.__count_events(len(self.__systems))
+        for system in self.__systems:
+            system.on_entities_added(entities)
+
+    def __on_entities_del(self, entities):
+        self.__count_events(len(self.__systems))
+        for system in self.__systems:
+            system.on_entities_deleted(entities)
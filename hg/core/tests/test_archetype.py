@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+
+from ..archetype import Archetype
+from ..world import World
+
+
+@dataclass
+class Foo:
+    value: int = 0
+
+
+@dataclass
+class Bar:
+    value: int = 0
+
+
+def test_archetype_swap_remove():
+    w = World()
+    entities = [w.add_entity() for _ in range(3)]
+
+    arch = Archetype((Foo, Bar))
+    for i, e in enumerate(entities):
+        arch.append(e, {Foo: Foo(i), Bar: Bar(i * 10)})
+
+    assert len(arch) == 3
+    assert arch.matches((Foo,))
+    assert arch.matches((Foo, Bar))
+    assert not arch.matches((Foo, int))
+
+    # removing the first row moves the last entity in its place
+    removed = arch.remove(entities[0].uid)
+    assert removed == {Foo: Foo(0), Bar: Bar(0)}
+    assert entities[0].uid not in arch
+    assert arch.entities == [entities[2], entities[1]]
+    assert arch.columns[Foo] == [Foo(2), Foo(1)]
+    assert arch.get(entities[2].uid, Bar) == Bar(20)
+    assert arch.components(entities[1].uid) == {Foo: Foo(1), Bar: Bar(10)}
+
+    # removing the last row doesn't move anything
+    arch.remove(entities[1].uid)
+    assert arch.entities == [entities[2]]
+    assert arch.get(entities[2].uid, Foo) == Foo(2)
+
+
+def test_world_archetype_moves():
+    w = World()
+
+    foo = w.add_entity(components=(Foo(1),))
+    foobar = w.add_entity(components=(Foo(2), Bar(2)))
+    bar = w.add_entity(components=(Bar(3),))
+
+    assert w.archetype_of(foo.uid) is not w.archetype_of(foobar.uid)
+    assert w.archetype_of(foobar.uid).signature == {Foo, Bar}
+
+    # entities with the same component set share the archetype, regardless of
+    # the order the components were added in
+    barfoo = w.add_entity(components=(Bar(4), Foo(4)))
+    assert w.archetype_of(barfoo.uid) is w.archetype_of(foobar.uid)
+
+    # queries only visit matching archetypes
+    archetypes = list(w.query_archetypes(Foo, Bar))
+    assert len(archetypes) == 1
+    assert set(archetypes[0].entities) == {foobar, barfoo}
+
+    assert {e.uid for e in w.entities_with(Foo)} == {foo.uid, foobar.uid, barfoo.uid}
+    assert {e.uid for e in w.entities_with(Bar)} == {bar.uid, foobar.uid, barfoo.uid}
+
+    # moving an entity to another archetype keeps its components
+    foobar.del_component(Bar)
+    assert w.archetype_of(foobar.uid) is w.archetype_of(foo.uid)
+    assert foobar[Foo] == Foo(2)
+    assert Bar not in foobar
+    assert {e.uid for e in w.entities_with(Foo, Bar)} == {barfoo.uid}
+
+    w.del_entity(barfoo)
+    assert w.archetype_of(barfoo.uid) is None
+    assert not barfoo.has_components(Foo)
+    assert list(w.query_archetypes(Foo, Bar)) == []
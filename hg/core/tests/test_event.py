@@ -1,5 +1,7 @@
 from unittest.mock import Mock
 
+import pytest
+
 from ..event import Event
 
 
@@ -24,3 +26,92 @@ def test_event_sub_unsub(mocker: Mock):
     ev -= listener
     ev('yet_another_call')
     listener.assert_not_called()
+
+
+def test_event_keyed_sub_unsub(mocker: Mock):
+    any_listener = mocker.Mock()
+    int_listener = mocker.Mock()
+    number_listener = mocker.Mock()
+
+    ev = Event('keyed_event', key=type)
+    ev += any_listener
+    ev.subscribe(int_listener, (int,))
+    ev.subscribe(number_listener, (int, float))
+
+    ev(1)
+    ev(2.0)
+    ev('three')
+
+    assert any_listener.call_count == 3
+    int_listener.assert_called_once_with(1)
+    assert number_listener.call_args_list == [mocker.call(1), mocker.call(2.0)]
+
+    # unsubscribing from some keys leaves the other ones
+    number_listener.reset_mock()
+    ev.unsubscribe(number_listener, (int,))
+    ev(1)
+    ev(2.0)
+    number_listener.assert_called_once_with(2.0)
+
+    # keyed subscriptions need a key function
+    with pytest.raises(ValueError):
+        Event('plain_event').subscribe(int_listener, (int,))
+
+
+def test_event_unsub_while_called(mocker: Mock):
+    ev = Event('some_event')
+    calls = []
+
+    def once(arg):
+        calls.append(arg)
+        ev.unsubscribe(once)
+
+    other = mocker.Mock()
+    ev += once
+    ev += other
+
+    ev(1)
+    ev(2)
+
+    assert calls == [1]
+    assert other.call_count == 2
+
+
+def test_event_queued(mocker: Mock):
+    listener = mocker.Mock()
+    batch_listener = mocker.Mock()
+
+    ev = Event('queued_event', queued=True)
+    ev += listener
+    ev.subscribe_batch(batch_listener)
+
+    # nothing is delivered until the flush
+    ev(1, 'a')
+    ev(2, 'b')
+    assert ev.pending == 2
+    listener.assert_not_called()
+    batch_listener.assert_not_called()
+
+    ev.flush()
+    assert ev.pending == 0
+    assert listener.call_args_list == [mocker.call(1, 'a'), mocker.call(2, 'b')]
+    batch_listener.assert_called_once_with([(1, 'a'), (2, 'b')])
+
+    # flushing an empty queue delivers nothing
+    ev.flush()
+    batch_listener.assert_called_once()
+
+    with pytest.raises(TypeError):
+        ev(3, arg='c')
+
+    # switching to immediate delivery flushes the pending notifications,
+    # batch listeners then get them one by one
+    ev(3, 'c')
+    ev.queued = False
+    ev(4, 'd')
+    assert batch_listener.call_args_list[1:] == [mocker.call([(3, 'c')]), mocker.call([(4, 'd')])]
+
+    ev.unsubscribe_batch(batch_listener)
+    ev(5, 'e')
+    assert batch_listener.call_count == 3
+    assert listener.call_count == 5
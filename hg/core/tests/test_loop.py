@@ -0,0 +1,58 @@
+import pytest
+
+from ..loop import FixedStepLoop
+from ..system import SystemRegistry
+from ..world import World
+
+
+@pytest.fixture
+def registry(mocker):
+    registry = SystemRegistry(World())
+    mocker.spy(registry, 'tick_all')
+    return registry
+
+
+def test_fixed_steps(registry):
+    loop = FixedStepLoop(registry, time_step=0.25)
+
+    assert loop.advance(0.125) == 0
+    assert loop.alpha == 0.5
+
+    assert loop.advance(0.5) == 2
+    assert loop.alpha == 0.5
+
+    assert loop.advance(0.125) == 1
+    assert loop.alpha == 0
+
+    assert loop.ticks == 3
+    assert registry.tick_all.call_count == 3
+
+
+def test_catch_up_cap(registry):
+    loop = FixedStepLoop(registry, time_step=0.25, max_steps=2)
+
+    # a stalled frame ticks at most the capped number of steps and drops the
+    # rest, keeping just the fraction of the last step
+    assert loop.advance(2.375) == 2
+    assert loop.dropped_ticks == 7
+    assert loop.alpha == 0.5
+
+    assert loop.advance(0.125) == 1
+    assert registry.tick_all.call_count == 3
+
+
+def test_clock(registry):
+    now = [10.0]
+    loop = FixedStepLoop(registry, time_step=0.5, clock=lambda: now[0])
+
+    # the first update just starts measuring time
+    assert loop.update() == 0
+
+    now[0] = 11.25
+    assert loop.update() == 2
+    assert loop.alpha == 0.5
+
+    loop.reset()
+    now[0] = 20.0
+    assert loop.update() == 0
+    assert loop.alpha == 0
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+from ..pool import ComponentPool, ComponentView
+from ..world import ComponentError, World
+
+
+@dataclass
+class Position:
+    x: float = 0
+    y: float = 0
+
+
+@dataclass
+class Stats:
+    hp: int = 10
+    alive: bool = True
+    name: str = ''
+
+
+def test_pool_alloc_free():
+    pool = ComponentPool(Stats, capacity=1)
+    assert pool.columns['hp'].dtype == np.int64
+    assert pool.columns['alive'].dtype == np.bool_
+    assert pool.columns['name'].dtype == object
+
+    a = pool.alloc(Stats(hp=5, name='a'))
+    b = pool.alloc(Stats(alive=False, name='b'))
+    assert pool.capacity == 2
+    assert len(pool) == 2
+
+    # views behave like the original components
+    assert isinstance(a, ComponentView)
+    assert a == Stats(hp=5, name='a')
+    assert a != b
+    assert a.hp == 5 and type(a.hp) is int
+    assert a.alive is True
+    assert b.name == 'b'
+    assert not hasattr(a, '__dict__')
+
+    # writes go straight to the columns
+    a.hp -= 3
+    assert pool.columns['hp'][a.slot] == 2
+    pool.columns['hp'][b.slot] = 42
+    assert b.hp == 42
+
+    # freed components are materialized and their slots are reused
+    freed = pool.free(a)
+    assert type(freed) is Stats
+    assert freed == Stats(hp=2, alive=True, name='a')
+    assert len(pool) == 1
+
+    c = pool.alloc(Stats(hp=7))
+    assert c.slot == 0
+    assert c.hp == 7
+    assert pool.alive.tolist() == [True, True]
+
+    with pytest.raises(TypeError):
+        pool.alloc(Position())
+
+    with pytest.raises(TypeError):
+        ComponentPool(int)
+
+
+def test_world_pooled_components():
+    w = World()
+    pool = ComponentPool(Position)
+    w.register_pool(pool)
+    assert w.pools[Position] is pool
+
+    with pytest.raises(ComponentError):
+        w.register_pool(ComponentPool(Position))
+
+    entities = [w.add_entity(components=(Position(i, -i),)) for i in range(3)]
+    assert len(pool) == 3
+    assert entities[1][Position].x == 1
+    assert entities[1][Position].y == -1
+
+    # systems can process whole columns at once
+    slots = pool.slots(e[Position] for e in w.query(Position))
+    pool.columns['y'][slots] += 10
+    assert [e[Position].y for e in entities] == [10, 9, 8]
+
+    # deleted components are handed back as regular instances
+    comp = entities[0].del_component(Position)
+    assert type(comp) is Position
+    assert comp == Position(0, 10)
+
+    w.del_entity(entities[1])
+    assert len(pool) == 1
+
+    # pools can't be registered after components of that type were added
+    other = World()
+    other.add_entity(components=(Stats(),))
+    with pytest.raises(ComponentError):
+        other.register_pool(ComponentPool(Stats))
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+
+from ..pool import ComponentPool
+from ..world import World
+
+
+@dataclass
+class Foo:
+    value: int = 0
+
+
+@dataclass
+class Bar:
+    value: int = 0
+
+
+def test_query_live_view():
+    w = World()
+    foo = w.add_entity(components=(Foo(),))
+    foobar = w.add_entity(components=(Foo(), Bar()))
+
+    # queries are cached by their component type set
+    query = w.query(Foo, Bar)
+    assert w.query(Bar, Foo) is query
+    assert w.query(Foo) is not query
+
+    # initial state is populated from the current world contents
+    assert len(query) == 1
+    assert foobar in query
+    assert foo not in query
+    assert set(query.uids) == {foobar.uid}
+
+    # adding the missing component makes the entity match
+    foo.add_component(Bar())
+    assert foo in query
+    assert foo.uid in query
+    assert {e.uid for e in query} == {foo.uid, foobar.uid}
+
+    # adding unrelated components doesn't affect the matches
+    bar = w.add_entity(components=(Bar(), 5))
+    assert len(query) == 2
+    assert bar not in query
+
+    # removing any of the queried components removes the entity from the view
+    foo.del_component(Foo)
+    assert foo not in query
+
+    # entities can be deleted while iterating
+    for e in query:
+        w.del_entity(e)
+    assert len(query) == 0
+
+
+def test_query_pooled_components():
+    w = World()
+    w.register_pool(ComponentPool(Foo, capacity=4))
+    query = w.query(Foo)
+
+    # pooled components are handed out as views, tracked by component type
+    e = w.add_entity(components=(Foo(1),))
+    assert e in query
+
+    e.del_component(Foo)
+    assert e not in query
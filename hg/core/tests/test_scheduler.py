@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from ..scheduler import Scheduler, build_stages
+from ..system import System, SystemRegistry
+from ..world import World
+
+
+class Foo:
+    pass
+
+
+class Bar:
+    pass
+
+
+class Baz:
+    pass
+
+
+class AccessSystem(System):
+
+    def __init__(self, name, log, reads=(), writes=(), barrier=None):
+        self.name = name
+        self.log = log
+        self.reads = reads
+        self.writes = writes
+        self.barrier = barrier
+
+    def tick(self, world):
+        if self.barrier is not None:
+            self.barrier.wait()
+        self.log.append(self.name)
+
+
+class UndeclaredSystem(System):
+
+    def tick(self, world):
+        pass
+
+
+class MainThreadSystem(System):
+
+    reads = writes = ()
+    main_thread = True
+
+    def __init__(self):
+        self.thread = None
+
+    def tick(self, world):
+        self.thread = threading.current_thread()
+
+
+def test_build_stages():
+    log = []
+    read_foo = AccessSystem('read_foo', log, reads=(Foo,))
+    read_foo_2 = AccessSystem('read_foo_2', log, reads=(Foo,))
+    write_foo = AccessSystem('write_foo', log, writes=(Foo,))
+    write_bar = AccessSystem('write_bar', log, reads=(Foo,), writes=(Bar,))
+    read_bar = AccessSystem('read_bar', log, reads=(Bar,))
+    write_baz = AccessSystem('write_baz', log, writes=(Baz,))
+    undeclared = UndeclaredSystem()
+    main_thread = MainThreadSystem()
+
+    stages = build_stages([read_foo, read_foo_2, write_foo, write_bar, read_bar, write_baz, undeclared, main_thread])
+    assert stages == [
+        # readers of the same component run together
+        [read_foo, read_foo_2, write_baz],
+        # the writer must wait for readers registered before it
+        [write_foo],
+        # which must finish before subsequent readers
+        [write_bar],
+        [read_bar],
+        # systems with unknown access or bound to the main thread always run
+        # alone
+        [undeclared],
+        [main_thread],
+    ]
+
+
+def test_parallel_tick():
+    w = World()
+    log = []
+
+    # both systems must reach the barrier at the same time, which can only
+    # happen if they're ticked concurrently
+    barrier = threading.Barrier(2, timeout=5)
+    scheduler = Scheduler(max_workers=2)
+    sysreg = SystemRegistry(w, scheduler=scheduler)
+    sysreg.register_system(AccessSystem('a', log, writes=(Foo,), barrier=barrier))
+    sysreg.register_system(AccessSystem('b', log, writes=(Bar,), barrier=barrier))
+    sysreg.register_system(AccessSystem('c', log, reads=(Foo, Bar)))
+    main_thread = MainThreadSystem()
+    sysreg.register_system(main_thread)
+
+    sysreg.tick_all()
+    assert sorted(log[:2]) == ['a', 'b']
+    assert log[2] == 'c'
+    assert main_thread.thread is threading.current_thread()
+
+    # errors raised by systems are propagated
+    class FailingSystem(System):
+        reads = writes = ()
+
+        def tick(self, world):
+            raise RuntimeError('boom')
+
+    sysreg.register_system(FailingSystem())
+    with pytest.raises(RuntimeError):
+        sysreg.tick_all()
+
+    scheduler.shutdown()
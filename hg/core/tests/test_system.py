@@ -94,12 +94,27 @@ def test_system_notif_by_world_changes(w, mocker):
     assert len(bar_sys.entities) == 0
     assert len(foobar_sys.entities) == 0
 
+    ###
+    # Batch additions and deletions are dispatched to the per-entity handlers
+    ###
+    batch = w.add_entities([(FooComp(),), (FooComp(), BarComp())])
+
+    assert len(foo_sys.entities) == 2
+    assert len(bar_sys.entities) == 1
+    assert len(foobar_sys.entities) == 1
+
+    w.del_entities(batch)
+
+    assert len(foo_sys.entities) == 0
+    assert len(bar_sys.entities) == 0
+    assert len(foobar_sys.entities) == 0
+
     for system in systems:
         spies[system]['on_entity_added'].assert_called()
-        assert spies[system]['on_entity_added'].call_count == 3
+        assert spies[system]['on_entity_added'].call_count == 5
 
         spies[system]['on_entity_deleted'].assert_called()
-        assert spies[system]['on_entity_deleted'].call_count == 3
+        assert spies[system]['on_entity_deleted'].call_count == 5
 
 
 def filter_by_type_subset(types: Tuple[type, ...], entity) -> bool:
@@ -275,3 +290,151 @@ def test_simple_game_ticking(w):
     # tick, and has also taken damage
     assert mob3[HitPoints].hp == mob_hp - fire_dmg_2
     assert mob3[Position].y < 2
+
+
+def test_deferred_structural_changes(w):
+
+    @dataclass
+    class Lifetime:
+        ticks: int
+
+    @dataclass
+    class Emitter:
+        count: int
+
+    class EmitterSystem(System):
+        """Spawns particles from emitters through the command buffer."""
+        def tick(self, world):
+            for entity in world.query(Emitter):
+                for _ in range(entity[Emitter].count):
+                    world.commands.add_entity('particle', (Lifetime(2),))
+
+    class LifetimeSystem(System):
+        """Ages particles and removes the expired ones."""
+        def tick(self, world):
+            for entity in world.query(Lifetime):
+                entity[Lifetime].ticks -= 1
+                if entity[Lifetime].ticks <= 0:
+                    world.commands.del_entity(entity)
+
+    sysreg = SystemRegistry(w)
+    sysreg.register_system(EmitterSystem())
+    sysreg.register_system(LifetimeSystem())
+
+    batches = []
+    w.on_entities_add += batches.append
+
+    emitter = w.add_entity(components=(Emitter(3),))
+
+    # spawned particles appear after the tick, in a single batch
+    sysreg.tick_all()
+    assert len(w.query(Lifetime)) == 3
+    assert len(batches) == 1
+    assert len(w.commands) == 0
+
+    # the emitter is removed and a component is added in the middle of a tick,
+    # while the deletions of the expiring particles are deferred as well
+    w.commands.del_entity(emitter)
+    w.commands.del_entity(emitter)
+    sysreg.tick_all()
+    assert not w.is_alive(emitter.uid)
+    assert len(w.query(Lifetime)) == 6
+
+    particle = next(iter(w.query(Lifetime)))
+    w.commands.add_component(particle, 'tag')
+    w.commands.del_component(particle, Lifetime)
+    w.flush_commands()
+    assert particle.component_types == (str,)
+
+    sysreg.tick_all()
+    sysreg.tick_all()
+    assert len(w.query(Lifetime)) == 0
+
+
+def test_component_notif_by_interest(w, mocker):
+
+    class FooComp:
+        pass
+
+    class BarComp:
+        pass
+
+    class BazComp:
+        pass
+
+    class WatchingSystem(System):
+
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+        def tick(self, world):
+            pass
+
+    foo_sys = WatchingSystem(reads=(FooComp,), writes=())
+    bar_sys = WatchingSystem(reads=(), writes=(FooComp,), watches=(BarComp,))
+    any_sys = WatchingSystem()
+
+    sysreg = SystemRegistry(w)
+    spies = {}
+    for system in (foo_sys, bar_sys, any_sys):
+        sysreg.register_system(system)
+        spies[system] = (
+            mocker.spy(system, 'on_entity_component_added'),
+            mocker.spy(system, 'on_entity_component_deleted'),
+        )
+
+    # per-entity notifications go to the systems watching the component types
+    e = w.add_entity(components=(FooComp(), BarComp(), BazComp()))
+    w.del_entity(e)
+
+    def types(spy):
+        return [type(call.args[1]) for call in spy.call_args_list]
+
+    assert [types(spy) for spy in spies[foo_sys]] == [[FooComp], [FooComp]]
+    assert [types(spy) for spy in spies[bar_sys]] == [[BarComp], [BarComp]]
+    assert [types(spy) for spy in spies[any_sys]] == [[FooComp, BarComp, BazComp]] * 2
+
+    # and so do the ones dispatched from batch notifications
+    for spy in (*spies[foo_sys], *spies[bar_sys]):
+        spy.reset_mock()
+    w.del_entities(w.add_entities([(FooComp(), BarComp())]))
+
+    assert [types(spy) for spy in spies[foo_sys]] == [[FooComp], [FooComp]]
+    assert [types(spy) for spy in spies[bar_sys]] == [[BarComp], [BarComp]]
+
+    # unregistered systems are closed and no longer notified
+    close = mocker.spy(foo_sys, 'close')
+    sysreg.unregister_system(foo_sys)
+    close.assert_called_once_with()
+    spies[foo_sys][0].reset_mock()
+    w.add_entity(components=(FooComp(),))
+    spies[foo_sys][0].assert_not_called()
+
+    # closing the registry closes all the remaining systems
+    close = mocker.spy(bar_sys, 'close')
+    sysreg.close()
+    close.assert_called_once_with()
+
+
+def test_queued_world_events(w, mocker):
+
+    class SpawnSystem(System):
+
+        def tick(self, world):
+            for _ in range(3):
+                world.add_entity()
+
+    sysreg = SystemRegistry(w)
+    system = SpawnSystem()
+    sysreg.register_system(system)
+    added = mocker.spy(system, 'on_entity_added')
+    batch_listener = mocker.Mock()
+
+    w.on_entity_add.queued = True
+    w.on_entity_add.subscribe_batch(batch_listener)
+
+    # queued world notifications are delivered at the end of the tick
+    sysreg.tick_all()
+    assert added.call_count == 3
+    assert len(batch_listener.call_args.args[0]) == 3
+    assert w.on_entity_add.pending == 0
@@ -1,10 +1,14 @@
 from dataclasses import dataclass
 from itertools import count
+from threading import Thread
 from unittest.mock import Mock
 
+import numpy as np
 import pytest
 
 from .. import world
+from ..component import TrackedComponent
+from ..pool import ComponentPool
 
 
 @pytest.fixture
@@ -139,3 +143,219 @@ def test_entity_dynamic_component_add_del(mocker):
     ###
     with pytest.raises(world.ComponentError):
         e[dict]
+
+
+@pytest.mark.usefixtures('count_from_one')
+def test_entity_handle_reuse():
+    w = world.World()
+
+    e1 = w.add_entity(components=(5,))
+    e2 = w.add_entity()
+    assert not hasattr(e1, '__dict__')
+    assert e1.component_types == (int,)
+
+    uid1 = e1.uid
+    w.del_entity(e1)
+    assert not w.is_alive(uid1)
+    assert w.is_alive(e2.uid)
+
+    # the storage of the deleted entity is reused with a new generation, so
+    # the stale handle doesn't resolve to the new entity
+    e3 = w.add_entity(components=('hello',))
+    assert e3.uid & world.INDEX_MASK == uid1 & world.INDEX_MASK
+    assert e3.uid != uid1
+    assert w[e3.uid] is e3
+
+    with pytest.raises(KeyError):
+        w[uid1]
+
+    with pytest.raises(KeyError):
+        w.del_entity(uid1)
+
+    assert int not in e1
+    assert e1.components == {}
+    with pytest.raises(world.ComponentError):
+        e1.add_component(1.0)
+
+    assert [e.uid for e in w.query_entities(lambda e: True)] == [e3.uid, e2.uid]
+
+
+def test_batch_add_del(mocker):
+    @dataclass
+    class Position:
+        x: float = 0
+        y: float = 0
+
+    @dataclass
+    class Velocity:
+        dx: float = 0
+
+    w = world.World()
+    entities_added = mocker.Mock()
+    entities_deleted = mocker.Mock()
+    entity_added = mocker.Mock()
+    comp_added = mocker.Mock()
+    w.on_entities_add += entities_added
+    w.on_entities_del += entities_deleted
+    w.on_entity_add += entity_added
+    w.on_entity_component_add += comp_added
+
+    query = w.query(Position, Velocity)
+
+    entities = w.add_entities(
+        [(Position(i, 0), Velocity(1)) for i in range(100)] + [(Position(),)],
+        name='particle')
+
+    # a single notification carries all the created entities
+    entities_added.assert_called_once_with(entities)
+    entity_added.assert_not_called()
+    comp_added.assert_not_called()
+
+    assert len(entities) == 101
+    assert entities[5][Position].x == 5
+    assert entities[5].name == 'particle'
+    assert w.archetype_of(entities[0].uid) is w.archetype_of(entities[99].uid)
+    assert len(query) == 100
+    assert entities[100] not in query
+
+    with pytest.raises(world.ComponentError):
+        w.add_entities([(Position(), Position())])
+
+    # deletion listeners still see the components of deleted entities
+    def check_deleted(deleted):
+        assert all(Position in e for e in deleted)
+
+    entities_deleted.side_effect = check_deleted
+    w.del_entities(entities[:50] + [entities[0].uid])
+
+    entities_deleted.assert_called_once()
+    assert entities_deleted.call_args[0][0] == entities[:50]
+    assert not any(w.is_alive(e.uid) for e in entities[:50])
+    assert len(query) == 50
+
+    # deleting all the entities notifies about each of them
+    entity_deleted = mocker.Mock()
+    comp_deleted = mocker.Mock()
+    w.on_entity_del += entity_deleted
+    w.on_entity_component_del += comp_deleted
+    entities_deleted.reset_mock()
+    w.del_entities()
+    assert not any(w.is_alive(e.uid) for e in entities)
+    assert len(query) == 0
+    entities_deleted.assert_not_called()
+    assert entity_deleted.call_count == 51
+    assert comp_deleted.call_count == 101
+
+
+def test_change_tracking():
+
+    class Pos:
+        pass
+
+    class Vel:
+        pass
+
+    w = world.World()
+    a = w.add_entity(components=(Pos(),))
+    b, c = w.add_entities([(Pos(), Vel()), (Pos(),)])
+
+    # added components count as changed
+    assert w.changed_since(Pos, 0) == [a, b, c]
+    assert w.changed_since(Vel, 0) == [b]
+
+    tick = w.change_tick
+    assert w.changed_since(Pos, tick) == []
+
+    # changed entities are listed in the order of their last change
+    a.mark_changed(Pos)
+    w.mark_many_changed([c, b.uid], Pos)
+    w.mark_changed(a.uid, Pos)
+    assert w.changed_since(Pos, tick) == [c, b, a]
+    assert w.changed_since(Vel, tick) == []
+
+    # deleted components and entities are no longer reported
+    tick = w.change_tick
+    c.mark_changed(Pos)
+    b.mark_changed(Vel)
+    b.del_component(Vel)
+    w.del_entity(c)
+    assert w.changed_since(Pos, tick) == []
+    assert w.changed_since(Vel, tick) == []
+
+    b.add_component(Vel())
+    assert w.changed_since(Vel, tick) == [b]
+
+    # arrays of uids are stamped all at once, in their order
+    tick = w.change_tick
+    w.mark_many_changed(np.array([b.uid, a.uid]), Pos)
+    assert w.changed_since(Pos, tick) == [b, a]
+
+    # changes of deleted entities don't stick to the ones reusing their index
+    tick = w.change_tick
+    d = w.add_entity(components=(Pos(),))
+    assert d.uid & world.INDEX_MASK == c.uid & world.INDEX_MASK
+    w.mark_changed(c.uid, Pos)
+    w.mark_many_changed([c.uid], Pos)
+    assert w.changed_since(Pos, tick) == [d]
+    assert w.changed_since(Pos, w.change_tick) == []
+
+
+@pytest.mark.parametrize('pooled', [False, True])
+def test_tracked_component_changes(pooled):
+
+    @dataclass
+    class Pos(TrackedComponent):
+        x: float = 0.0
+        y: float = 0.0
+
+    w = world.World()
+    if pooled:
+        w.register_pool(ComponentPool(Pos))
+    a, b = w.add_entities([(Pos(),), (Pos(),)])
+
+    # plain writes to tracked components are stamped as changes
+    tick = w.change_tick
+    b[Pos].x = 1.0
+    b[Pos].y = 2.0
+    a[Pos].y = 3.0
+    assert w.changed_since(Pos, tick) == [b, a]
+    assert (b[Pos].x, b[Pos].y) == (1.0, 2.0)
+
+    tick = w.change_tick
+    assert w.changed_since(Pos, tick) == []
+    a[Pos].x = 4.0
+    assert w.changed_since(Pos, tick) == [a]
+
+    # writes to components no longer attached aren't
+    tick = w.change_tick
+    pos = b[Pos]
+    b.del_component(Pos)
+    pos.x = 5.0
+    comp = a[Pos]
+    w.del_entity(a)
+    comp.x = 6.0
+    assert w.changed_since(Pos, tick) == []
+
+
+def test_concurrent_changes():
+
+    class Pos:
+        pass
+
+    w = world.World()
+    entities = w.add_entities([(Pos(),)] * 10)
+    tick = w.change_tick
+
+    def mark():
+        for _ in range(1000):
+            w.mark_changed(entities[0], Pos)
+            w.mark_many_changed(entities, Pos)
+
+    # each change gets a tick of its own even when marked from many threads
+    threads = [Thread(target=mark) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert w.change_tick == tick + 8000
+    assert sorted(e.uid for e in w.changed_since(Pos, tick)) == sorted(e.uid for e in entities)
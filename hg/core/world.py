@@ -1,22 +1,92 @@
-from copy import copy
+from collections import deque
 from itertools import count
-from typing import (Any, Callable, Dict, Generator, Mapping, Sequence, Union,
-                    cast)
+from threading import Lock
+from typing import (Any, Callable, Deque, Dict, FrozenSet, Generator,
+                    Iterable, List, Mapping, Optional, Sequence, Tuple,
+                    Union)
 
+import numpy as np
+
+from .archetype import Archetype
+from .commands import CommandBuffer
+from .component import TrackedComponent
 from .event import Event
+from .pool import ComponentPool, TrackedView, component_type
+from .query import Query
+
+
+# entity uids are handles combining a storage index in the lower bits and the
+# generation of that index in the upper ones, so that uids of deleted entities
+# are never mistaken for the ones reusing their storage
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
 
 
 class ComponentError(Exception):
     pass
 
 
+class ChangeLog:
+    """
+    Last changes of the components of one type, as arrays indexed by entity
+    storage index holding the change tick, the uid of the entity stamped and
+    a sequence number ordering the changes. A zero tick means no change.
+
+    Stamping many entities at once is a single vectorized assignment.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.ticks = np.zeros(capacity, dtype=np.int64)
+        self.uids = np.zeros(capacity, dtype=np.int64)
+        self.order = np.zeros(capacity, dtype=np.int64)
+        self.seq = 0
+
+    def stamp(self, uids: np.ndarray, tick: int):
+        indices = uids & INDEX_MASK
+        if len(indices):
+            self.reserve(int(indices.max()) + 1)
+        self.ticks[indices] = tick
+        self.uids[indices] = uids
+        self.order[indices] = np.arange(self.seq, self.seq + len(uids))
+        self.seq += len(uids)
+
+    def stamp_one(self, uid: int, tick: int):
+        index = uid & INDEX_MASK
+        self.reserve(index + 1)
+        self.ticks[index] = tick
+        self.uids[index] = uid
+        self.order[index] = self.seq
+        self.seq += 1
+
+    def forget(self, uid: int):
+        index = uid & INDEX_MASK
+        if index < len(self.ticks):
+            self.ticks[index] = 0
+
+    def since(self, tick: int) -> List[Tuple[int, int]]:
+        # storage indices and uids changed after given tick, oldest first
+        indices = np.nonzero(self.ticks > tick)[0]
+        indices = indices[np.argsort(self.order[indices])]
+        return list(zip(indices.tolist(), self.uids[indices].tolist()))
+
+    def reserve(self, capacity: int):
+        if capacity > len(self.ticks):
+            capacity = max(capacity, 2 * len(self.ticks))
+            for name in ('ticks', 'uids', 'order'):
+                old = getattr(self, name)
+                new = np.zeros(capacity, dtype=np.int64)
+                new[:len(old)] = old
+                setattr(self, name, new)
+
+
 class Entity:
 
+    __slots__ = ('__world', '__id', '__name')
+
     def __init__(self, world, uid: int, name: str = ''):
         self.__world = world
         self.__id = uid
         self.__name = name
-        self.__components: Dict[type, Any] = {}
 
     @property
     def uid(self):
@@ -27,40 +97,48 @@ class Entity:
         return self.__name
 
     def add_component(self, comp) -> Any:
-        comp_type = type(comp)
-        if comp_type in self.__components:
-            raise ComponentError(f'{self} already has a component of type "{comp_type.__name__}"')
-
-        self.__components[comp_type] = comp
-        self.__world.on_entity_component_add(self, comp)
-        return comp
+        return self.__world.add_component(self, comp)
 
     def del_component(self, comp_type: type) -> Any:
-        if comp_type not in self.__components:
-            raise ComponentError(f'{self} does not have a component of type "{comp_type.__name__}"')
+        return self.__world.del_component(self, comp_type)
 
-        comp = self.__components[comp_type]
-        self.__world.on_entity_component_del(self, comp)
-        self.__components.pop(comp_type)
-        return comp
+    def mark_changed(self, comp_type: type):
+        self.__world.mark_changed(self, comp_type)
+
+    @property
+    def component_types(self) -> Tuple[type, ...]:
+        archetype = self.__world.archetype_of(self.__id)
+        if archetype is None:
+            return ()
+        return archetype.types
 
     @property
     def components(self) -> Mapping[type, Any]:
-        return copy(self.__components)
+        archetype = self.__world.archetype_of(self.__id)
+        if archetype is None:
+            return {}
+        return archetype.components(self.__id)
 
     def has_components(self, *comp_types) -> bool:
-        return all(comp_type in self for comp_type in comp_types)
+        archetype = self.__world.archetype_of(self.__id)
+        return archetype is not None and archetype.matches(comp_types)
 
     def __repr__(self) -> str:
         return f'Entity(world={id(self.__world)}, uid={self.__id}, name={self.__name})'
 
     def __getitem__(self, comp_type: type) -> Any:
-        if comp_type not in self.__components:
+        archetype = self.__world.archetype_of(self.__id)
+        if archetype is None or comp_type not in archetype.columns:
             raise ComponentError(f'{self} does not have a component of type "{comp_type.__name__}"')
-        return self.__components[comp_type]
+        return archetype.get(self.__id, comp_type)
 
     def __contains__(self, comp_type: type) -> bool:
-        return comp_type in self.__components
+        archetype = self.__world.archetype_of(self.__id)
+        return archetype is not None and comp_type in archetype.columns
+
+
+def changed_component_type(entity: 'Entity', comp: Any) -> type:
+    return component_type(comp)
 
 
 class World:
@@ -68,15 +146,47 @@ class World:
     def __init__(self):
         self.on_entity_add = Event('on_entity_add')
         self.on_entity_del = Event('on_entity_del')
-        self.on_entity_component_add = Event('on_entity_component_add')
-        self.on_entity_component_del = Event('on_entity_component_del')
+        # component events can be subscribed to for given component types only
+        self.on_entity_component_add = Event('on_entity_component_add', key=changed_component_type)
+        self.on_entity_component_del = Event('on_entity_component_del', key=changed_component_type)
+        self.on_entities_add = Event('on_entities_add')
+        self.on_entities_del = Event('on_entities_del')
+        self.__events = (
+            self.on_entity_add,
+            self.on_entity_del,
+            self.on_entity_component_add,
+            self.on_entity_component_del,
+            self.on_entities_add,
+            self.on_entities_del,
+        )
+
+        # structural changes deferred until the next sync point
+        self.commands = CommandBuffer()
 
-        self.__entities = {}
+        self.__entities: List[Optional[Entity]] = []
+        self.__locations: List[Optional[Archetype]] = []
+        self.__generations: List[int] = []
+        self.__free: Deque[int] = deque()
+        self.__root = Archetype(())
+        self.__archetypes: Dict[FrozenSet[type], Archetype] = {self.__root.signature: self.__root}
+        self.__queries: Dict[FrozenSet[type], Query] = {}
+        self.__pools: Dict[type, ComponentPool] = {}
         self.__id_gen = count(1000)
 
+        # change ticks of components, by type and then by entity uid, with the
+        # entities kept in the order of their last change; guarded by a lock,
+        # as systems ticking concurrently may mark changes
+        self.__change_tick = 0
+        self.__changes: Dict[type, ChangeLog] = {}
+        self.__changes_lock = Lock()
+
+        # tracked components written since the changes were last collected
+        self.__writes: List[Any] = []
+
     def add_entity(self, name: str = '', components: Sequence = None) -> Entity:
-        entity = Entity(self, uid=next(self.__id_gen), name=name)
-        self.__entities[entity.uid] = entity
+        entity = self.__new_entity(name)
+        self.__locations[entity.uid & INDEX_MASK] = self.__root
+        self.__root.append(entity, {})
         self.on_entity_add(entity)
 
         for comp in components or ():
@@ -84,27 +194,335 @@ class World:
 
         return entity
 
+    def add_entities(self, components: Iterable[Sequence], name: str = '') -> List[Entity]:
+        """
+        Create an entity for each given sequence of components.
+
+        Entities are placed straight into their final archetypes and announced
+        with a single `on_entities_add` notification, instead of per-entity
+        `on_entity_add` and `on_entity_component_add` ones.
+        """
+        entities = []
+        archetypes: Dict[Tuple[type, ...], Archetype] = {}
+        for comps in components:
+            comp_types = tuple(type(comp) for comp in comps)
+            archetype = archetypes.get(comp_types)
+            if archetype is None:
+                if len(set(comp_types)) != len(comp_types):
+                    raise ComponentError(f'Duplicate component types in {comp_types}')
+                archetype = self.__root
+                for comp_type in comp_types:
+                    archetype = self.__archetype_with(archetype, comp_type)
+                archetypes[comp_types] = archetype
+
+            entity = self.__new_entity(name)
+            self.__locations[entity.uid & INDEX_MASK] = archetype
+            components = {type(comp): self.__pooled(comp) for comp in comps}
+            for comp in components.values():
+                self.__track(comp, entity.uid)
+            archetype.append(entity, components)
+            entities.append(entity)
+
+        if entities:
+            self.__change_tick += 1
+            for entity in entities:
+                for comp_type in self.__locations[entity.uid & INDEX_MASK].types:
+                    self.__touch(comp_type, entity.uid)
+
+            self.on_entities_add(entities)
+
+        return entities
+
     def del_entity(self, entity: Union[Entity, int]):
-        if isinstance(entity, int):
-            entity = self.__entities.pop(entity)
+        uid = entity if isinstance(entity, int) else entity.uid
+        entity = self[uid]
+
+        # notify about each component while the entity still owns all of them,
+        # then drop the whole row from its archetype at once
+        for comp in self.__locations[uid & INDEX_MASK].components(uid).values():
+            self.on_entity_component_del(entity, comp)
+
+        self.__retire(entity)
+        self.on_entity_del(entity)
+
+    def del_entities(self, entities: Iterable[Union[Entity, int]] = None):
+        """
+        Delete given entities, or all of them if none are specified.
+
+        Listeners of given entities get a single `on_entities_del`
+        notification, sent while the entities still have all their
+        components. Deleting all the entities notifies about each of them
+        and their components instead, as `del_entity` does.
+        """
+        if entities is None:
+            for entity in [e for e in self.__entities if e is not None]:
+                self.del_entity(entity)
+            return
+
+        uids = dict.fromkeys(e if isinstance(e, int) else e.uid for e in entities)
+        targets = [self[uid] for uid in uids]
+
+        if targets:
+            self.on_entities_del(targets)
+
+        for entity in targets:
+            self.__retire(entity)
+
+    def flush_commands(self):
+        self.commands.flush(self)
+
+    def flush_events(self):
+        # delivers the notifications of events switched to queued mode, live
+        # queries rely on component events being delivered immediately though
+        for event in self.__events:
+            event.flush()
+
+    def is_alive(self, uid: int) -> bool:
+        return self.archetype_of(uid) is not None
+
+    def add_component(self, entity: Entity, comp) -> Any:
+        comp_type = type(comp)
+        src = self.__location(entity)
+        if comp_type in src.columns:
+            raise ComponentError(f'{entity} already has a component of type "{comp_type.__name__}"')
+
+        comp = self.__pooled(comp)
+        self.__track(comp, entity.uid)
+        dst = self.__archetype_with(src, comp_type)
+        components = src.remove(entity.uid)
+        components[comp_type] = comp
+        dst.append(entity, components)
+        self.__locations[entity.uid & INDEX_MASK] = dst
+        self.__change_tick += 1
+        self.__touch(comp_type, entity.uid)
+
+        self.on_entity_component_add(entity, comp)
+        return comp
+
+    def del_component(self, entity: Entity, comp_type: type) -> Any:
+        src = self.__location(entity)
+        if comp_type not in src.columns:
+            raise ComponentError(f'{entity} does not have a component of type "{comp_type.__name__}"')
+
+        comp = src.get(entity.uid, comp_type)
+        self.on_entity_component_del(entity, comp)
+
+        dst = src.del_edges.get(comp_type)
+        if dst is None:
+            dst = self.__get_archetype(tuple(t for t in src.types if t is not comp_type))
+            src.del_edges[comp_type] = dst
+            dst.add_edges[comp_type] = src
+
+        components = src.remove(entity.uid)
+        components.pop(comp_type)
+        dst.append(entity, components)
+        self.__locations[entity.uid & INDEX_MASK] = dst
+        self.__forget_changes(comp_type, entity.uid)
+        self.__untrack(comp)
+
+        pool = self.__pools.get(comp_type)
+        if pool is not None:
+            comp = pool.free(comp)
+
+        return comp
+
+    @property
+    def change_tick(self) -> int:
+        with self.__changes_lock:
+            self.__collect_writes()
+            return self.__change_tick
+
+    def mark_changed(self, entity: Union[Entity, int], comp_type: type):
+        uid = entity if isinstance(entity, int) else entity.uid
+        if not self.is_alive(uid):
+            return
+        with self.__changes_lock:
+            self.__change_tick += 1
+            self.__touch(comp_type, uid)
+
+    def mark_many_changed(self, entities: Union[Iterable[Union[Entity, int]], np.ndarray], comp_type: type):
+        """
+        Mark the components of given type of many entities as changed at
+        once, given as entities, uids or an array of uids. Arrays are stamped
+        without visiting their uids one by one, and must only hold uids of
+        live entities; deleted ones are skipped otherwise.
+        """
+        if isinstance(entities, np.ndarray):
+            uids = entities.astype(np.int64, copy=False)
         else:
-            self.__entities.pop(entity.uid)
+            uids = np.array([
+                uid for uid in (entity if isinstance(entity, int) else entity.uid for entity in entities)
+                if self.is_alive(uid)
+            ], dtype=np.int64)
+        with self.__changes_lock:
+            self.__change_tick += 1
+            self.__log(comp_type).stamp(uids, self.__change_tick)
 
-        entity = cast(Entity, entity)
+    def changed_since(self, comp_type: type, tick: int) -> List[Entity]:
+        """
+        Get the entities whose component of given type was added or marked as
+        changed after given change tick, in the order of their last change.
 
-        for comp_type in entity.components:
-            entity.del_component(comp_type)
+        Systems interested in changes remember the `change_tick` at the start
+        of their run and pass it on the next one. Changes are found by a
+        vectorized scan of the change ticks, the rest of the cost is
+        proportional to the number of changed entities only.
+        """
+        with self.__changes_lock:
+            self.__collect_writes()
+            changes = self.__changes.get(comp_type)
+            if changes is None:
+                return []
+            changed = changes.since(tick)
 
-        self.on_entity_del(entity)
+        entities = self.__entities
+        return [
+            entities[index] for index, uid in changed
+            if entities[index] is not None and entities[index].uid == uid
+        ]
+
+    def register_pool(self, pool: ComponentPool):
+        if pool.comp_type in self.__pools:
+            raise ComponentError(f'A pool for "{pool.comp_type.__name__}" components is already registered')
+        if next(self.query_archetypes(pool.comp_type), None) is not None:
+            raise ComponentError(f'Cannot pool "{pool.comp_type.__name__}", entities already have such components')
+        self.__pools[pool.comp_type] = pool
+
+    @property
+    def pools(self) -> Mapping[type, ComponentPool]:
+        return self.__pools
 
-    def del_entities(self):
-        for uid in list(self.__entities):
-            self.del_entity(uid)
+    def archetype_of(self, uid: int) -> Optional[Archetype]:
+        index = uid & INDEX_MASK
+        if index < len(self.__entities):
+            entity = self.__entities[index]
+            if entity is not None and entity.uid == uid:
+                return self.__locations[index]
+        return None
+
+    def query_archetypes(self, *comp_types: type) -> Generator[Archetype, None, None]:
+        for archetype in list(self.__archetypes.values()):
+            if archetype.entities and archetype.matches(comp_types):
+                yield archetype
 
     def query_entities(self, filter: Callable[[Entity], bool]) -> Generator[Entity, None, None]:
-        for entity in self.__entities.values():
-            if filter(entity):
+        for entity in self.__entities:
+            if entity is not None and filter(entity):
                 yield entity
 
+    def query(self, *comp_types: type) -> Query:
+        signature = frozenset(comp_types)
+        query = self.__queries.get(signature)
+        if query is None:
+            query = Query(self, comp_types)
+            self.__queries[signature] = query
+        return query
+
+    def entities_with(self, *comp_types: type) -> Generator[Entity, None, None]:
+        for archetype in self.query_archetypes(*comp_types):
+            yield from archetype.entities
+
+    def __new_entity(self, name: str) -> Entity:
+        if self.__free:
+            index = self.__free.popleft()
+        else:
+            index = next(self.__id_gen)
+            if index >= len(self.__entities):
+                grow = index + 1 - len(self.__entities)
+                self.__entities.extend([None] * grow)
+                self.__locations.extend([None] * grow)
+                self.__generations.extend([0] * grow)
+
+        entity = Entity(self, uid=(self.__generations[index] << INDEX_BITS) | index, name=name)
+        self.__entities[index] = entity
+        return entity
+
+    def __retire(self, entity: Entity):
+        index = entity.uid & INDEX_MASK
+        for comp_type, comp in self.__locations[index].remove(entity.uid).items():
+            self.__forget_changes(comp_type, entity.uid)
+            self.__untrack(comp)
+            pool = self.__pools.get(comp_type)
+            if pool is not None:
+                pool.free(comp)
+
+        # retire the handle and make the index available for reuse
+        self.__entities[index] = None
+        self.__locations[index] = None
+        self.__generations[index] += 1
+        self.__free.append(index)
+
+    def __log(self, comp_type: type) -> ChangeLog:
+        changes = self.__changes.get(comp_type)
+        if changes is None:
+            changes = self.__changes[comp_type] = ChangeLog(max(len(self.__entities), 1024))
+        return changes
+
+    def __touch(self, comp_type: type, uid: int):
+        self.__log(comp_type).stamp_one(uid, self.__change_tick)
+
+    def __forget_changes(self, comp_type: type, uid: int):
+        changes = self.__changes.get(comp_type)
+        if changes is not None:
+            changes.forget(uid)
+
+    def __track(self, comp: Any, uid: int):
+        if isinstance(comp, (TrackedComponent, TrackedView)):
+            object.__setattr__(comp, '_world_writes', self.__writes)
+            object.__setattr__(comp, '_uid', uid)
+            object.__setattr__(comp, '_written', False)
+
+    @staticmethod
+    def __untrack(comp: Any):
+        if isinstance(comp, (TrackedComponent, TrackedView)):
+            object.__setattr__(comp, '_world_writes', None)
+
+    def __collect_writes(self):
+        # stamp the writes to tracked components as a single change, with the
+        # changes lock held
+        if not self.__writes:
+            return
+
+        # the list is shared with the components, which may still append to
+        # it from other threads, so only the collected writes are removed
+        writes = self.__writes[:]
+        del self.__writes[:len(writes)]
+        self.__change_tick += 1
+        uids: Dict[type, List[int]] = {}
+        for comp in writes:
+            if comp._world_writes is not None:
+                object.__setattr__(comp, '_written', False)
+                uids.setdefault(component_type(comp), []).append(comp._uid)
+        for comp_type, written in uids.items():
+            self.__log(comp_type).stamp(np.array(written, dtype=np.int64), self.__change_tick)
+
+    def __pooled(self, comp: Any) -> Any:
+        pool = self.__pools.get(type(comp))
+        return comp if pool is None else pool.alloc(comp)
+
+    def __archetype_with(self, src: Archetype, comp_type: type) -> Archetype:
+        dst = src.add_edges.get(comp_type)
+        if dst is None:
+            dst = self.__get_archetype(src.types + (comp_type,))
+            src.add_edges[comp_type] = dst
+            dst.del_edges[comp_type] = src
+        return dst
+
+    def __location(self, entity: Entity) -> Archetype:
+        archetype = self.archetype_of(entity.uid)
+        if archetype is None:
+            raise ComponentError(f'{entity} does not belong to the world')
+        return archetype
+
+    def __get_archetype(self, types) -> Archetype:
+        signature = frozenset(types)
+        archetype = self.__archetypes.get(signature)
+        if archetype is None:
+            archetype = Archetype(tuple(types))
+            self.__archetypes[signature] = archetype
+        return archetype
+
     def __getitem__(self, uid) -> Entity:
-        return self.__entities[uid]
+        if self.archetype_of(uid) is None:
+            raise KeyError(uid)
+        return self.__entities[uid & INDEX_MASK]
@@ -5,6 +5,7 @@ import inject
 import sdl2
 import sdl2.ext
 
+from hg.core.loop import FixedStepLoop
 from hg.core.system import SystemRegistry
 from hg.core.world import World
 from hg.game.components.body_component import BodyComponent
@@ -13,6 +14,7 @@ from hg.game.components.sprite_component import SpriteComponent
 from hg.game.settings import Settings
 from hg.game.systems.physics_system import PhysicsSystem
 from hg.game.systems.sprite_render_system import SpriteRenderSystem
+from hg.gfx.sprite_renderer.camera import Camera
 from hg.gfx.sprite_renderer.renderer import SpriteRenderer
 from hg.res.loaders.image_loader import ImageLoader
 from hg.res.loaders.sprite_loader import SpriteLoader
@@ -25,19 +27,19 @@ def config(renderer: sdl2.SDL_Renderer, binder: inject.Binder):
     binder.bind(ImageLoader, ImageLoader(renderer))
     binder.bind(SpriteSheetLoader, SpriteSheetLoader())
     binder.bind(SpriteLoader, SpriteLoader())
-    binder.bind(SpriteRenderer, SpriteRenderer(renderer))
+    binder.bind(SpriteRenderer, SpriteRenderer(renderer, camera=Camera(0, 0, 800, 600)))
     binder.bind(Settings, Settings())
 
 
-def setup_systems(w: World) -> SystemRegistry:
+def setup_systems(w: World, sprite_system: SpriteRenderSystem) -> SystemRegistry:
     reg = SystemRegistry(w)
 
-    # sprite render system
-    reg.register_system(SpriteRenderSystem())
-
     # physics system
     reg.register_system(PhysicsSystem())
 
+    # sprite render system, ticked after physics to pick up the new positions
+    reg.register_system(sprite_system)
+
     return reg
 
 
@@ -64,36 +66,29 @@ if __name__ == '__main__':
     sprite_renderer = inject.instance(SpriteRenderer)
 
     w = World()
-    systems = setup_systems(w)
+    sprite_system = SpriteRenderSystem()
+    systems = setup_systems(w, sprite_system)
     populate_world(w)
 
-    tick = 0
-    tick_time = inject.instance(Settings).physics_time_step * 1000
-    last_frame_time = sdl2.SDL_GetTicks()
-    time_acc = 0
+    settings = inject.instance(Settings)
+    loop = FixedStepLoop(systems, settings.physics_time_step, settings.max_catch_up_steps)
     run = True
     while run:
-        renderer.clear()
-
-        now = sdl2.SDL_GetTicks()
-        time_acc += now - last_frame_time
-        last_frame_time = now
+        events = sdl2.ext.get_events()
+        for event in events:
+            if event.type == sdl2.SDL_QUIT:
+                run = False
+                break
 
-        while time_acc >= tick_time:
-            time_acc -= tick_time
+        loop.update()
 
-            events = sdl2.ext.get_events()
-            for event in events:
-                if event.type == sdl2.SDL_QUIT:
-                    run = False
-                    break
-
-            systems.tick_all()
-
-            tick += 1
+        # render in between the last two physics states
+        sprite_system.interpolate(loop.alpha)
 
+        renderer.clear()
         sprite_renderer.render()
         renderer.present()
         window.refresh()
 
+    systems.close()
     sdl2.ext.quit()
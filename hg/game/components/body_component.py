@@ -1,3 +1,4 @@
+from hg.math import Vector2
 from hg.physics.body import Body
 
 
@@ -14,5 +15,13 @@ class BodyComponent:
     def mass(self, value: float):
         self.__body.mass = value
 
+    @property
+    def size(self) -> Vector2:
+        return self.__body.size
+
+    @size.setter
+    def size(self, value: Vector2):
+        self.__body.size = value
+
     def get_body(self) -> Body:
         return self.__body
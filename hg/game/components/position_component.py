@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 
+from hg.core.component import TrackedComponent
+
 
 @dataclass
-class PositionComponent:
+class PositionComponent(TrackedComponent):
 
     x: float = 0
     y: float = 0
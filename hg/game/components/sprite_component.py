@@ -1,7 +1,10 @@
 from dataclasses import dataclass
 
+from hg.core.component import TrackedComponent
+
 
 @dataclass
-class SpriteComponent:
+class SpriteComponent(TrackedComponent):
 
     resource: str = ''
+    z: int = 0
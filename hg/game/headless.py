@@ -0,0 +1,110 @@
+import hashlib
+from dataclasses import fields, is_dataclass
+from typing import Any, Iterable, List, Optional, Tuple
+
+import inject
+
+from hg.core.pool import ComponentView
+from hg.core.system import System, SystemRegistry
+from hg.core.world import Entity, World
+
+from .components.body_component import BodyComponent
+from .settings import Settings
+
+
+def sorted_entities(world: World) -> List[Entity]:
+    return sorted(world.query_entities(lambda e: True), key=lambda e: e.uid)
+
+
+def component_state(comp: Any) -> Tuple:
+    if isinstance(comp, ComponentView):
+        return tuple(getattr(comp, name) for name in comp.pool.field_names)
+    if is_dataclass(comp):
+        return tuple(getattr(comp, field.name) for field in fields(comp))
+    if isinstance(comp, BodyComponent):
+        body = comp.get_body()
+        return (*body.position, *body.velocity, *body.size, body.mass, body.sleeping)
+    raise TypeError(f'no state digest support for {type(comp).__name__} components')
+
+
+def state_digest(world: World, *comp_types: type) -> str:
+    """
+    Compute a digest of the state of the world, covering the components of
+    given types, or all the components if none are given.
+
+    Entities are visited by uid and components by type name, while floats
+    are hashed by their exact representation, so that equal digests mean
+    bit-identical states.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for entity in sorted_entities(world):
+        components = entity.components
+        types = comp_types or components.keys()
+        for comp_type in sorted((t for t in types if t in components), key=lambda t: t.__qualname__):
+            state = (entity.uid, comp_type.__qualname__, component_state(components[comp_type]))
+            digest.update(repr(state).encode())
+    return digest.hexdigest()
+
+
+class HeadlessRunner:
+    """
+    Runs the simulation without rendering, ticking the systems back to back
+    at the fixed physics time step, as fast as possible.
+
+    Only systems marked as headless are registered, and they always tick
+    sequentially in registration order, without any wall clock involved, so
+    that runs starting from the same world produce bit-identical results.
+    Systems read the settings through the injector, which is configured with
+    the runner's ones unless it's configured already, in which case the
+    runner takes the injected settings; passing other ones is an error.
+
+    The systems are closed along with the runner, which is best used as a
+    context manager.
+    """
+
+    def __init__(self, world: World, systems: Iterable[System] = (), settings: Optional[Settings] = None):
+        self.world = world
+        if inject.is_configured():
+            injected = inject.instance(Settings)
+            if settings is not None and settings is not injected:
+                raise ValueError('The injector is configured already with other settings')
+            settings = injected
+        self.settings = settings or Settings()
+        self.registry = SystemRegistry(world)
+        self.ticks = 0
+
+        # the world may be populated already, so let the systems catch up
+        # with the existing entities
+        entities = sorted_entities(world)
+        for system in systems:
+            if system.headless:
+                self.registry.register_system(system)
+                system.on_entities_added(entities)
+
+        if not inject.is_configured():
+            inject.configure(self.__config)
+
+    @property
+    def time(self) -> float:
+        return self.ticks * self.settings.physics_time_step
+
+    def run(self, ticks: int) -> str:
+        for _ in range(ticks):
+            self.registry.tick_all()
+        self.ticks += ticks
+        return self.digest()
+
+    def digest(self, *comp_types: type) -> str:
+        return state_digest(self.world, *comp_types)
+
+    def close(self):
+        self.registry.close()
+
+    def __enter__(self) -> 'HeadlessRunner':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __config(self, binder: inject.Binder):
+        binder.bind(Settings, self.settings)
@@ -2,4 +2,8 @@ class Settings:
 
     def __init__(self, **settings):
         self.physics_time_step = settings.get('physics_time_step', 0.015)
+        self.max_catch_up_steps = settings.get('max_catch_up_steps', 5)
         self.gravity_force = settings.get('gravity_force', 98)
+        self.sleep_enabled = settings.get('sleep_enabled', True)
+        self.sleep_velocity = settings.get('sleep_velocity', 0.1)
+        self.sleep_delay = settings.get('sleep_delay', 0.5)
@@ -1,30 +1,216 @@
+from typing import Any, List, Optional, Tuple
+
 import inject
+import numpy as np
 
+from hg.core.event import Event
+from hg.core.pool import component_type
 from hg.core.system import System
-from hg.core.world import World
+from hg.core.world import Entity, World
 from hg.game.components.body_component import BodyComponent
 from hg.game.components.position_component import PositionComponent
 from hg.game.settings import Settings
 from hg.math import Vector2
-from hg.physics.motion import apply_gravity, apply_velocity
+from hg.physics.batch import BodyBatch
+from hg.spatial import SpatialHash
+from hg.physics.motion import apply_gravity, apply_velocity, update_sleep
+from hg.physics.narrowphase import find_contacts, resolve_contacts
+from hg.physics.parallel import SharedBodyBatch
+
+# pairs of entity uids in contact, with the contact normals and depths
+Contacts = Tuple[np.ndarray, np.ndarray, np.ndarray]
 
 
 class PhysicsSystem(System):
 
+    reads = (BodyComponent, PositionComponent)
+    writes = (BodyComponent, PositionComponent)
+
+    def __init__(self, batched: bool = False, processes: int = 0, cell_size: Optional[float] = None):
+        # with processes specified, bodies are integrated in chunks over
+        # shared memory by a pool of worker processes
+        self.__batch: Optional[BodyBatch] = None
+        if processes > 0:
+            self.__batch = SharedBodyBatch(processes=processes)
+        elif batched:
+            self.__batch = BodyBatch()
+
+        # with a cell size specified, bodies are tracked in a spatial hash
+        # providing the candidate pairs for collision checks; contacts are
+        # queued and delivered once per tick, batch listeners get all of them
+        # in a single call
+        self.on_contact = Event('on_contact', queued=True)
+        self.__broadphase: Optional[SpatialHash] = None
+        if cell_size is not None:
+            self.__broadphase = SpatialHash(cell_size)
+
+        # change tick as of the end of the last tick, the positions changed
+        # after it by others wake their bodies up
+        self.__change_tick = 0
+
+    @property
+    def batch(self) -> Optional[BodyBatch]:
+        return self.__batch
+
+    @property
+    def broadphase(self) -> Optional[SpatialHash]:
+        return self.__broadphase
+
     def tick(self, world: World):
         cfg = inject.instance(Settings)
+        for entity in world.changed_since(PositionComponent, self.__change_tick):
+            if BodyComponent in entity:
+                self.wake(entity)
+
+        if self.__batch is not None:
+            contacts = self.__tick_batched(world, cfg)
+        else:
+            contacts = self.__tick_entities(world, cfg)
+
+        # leave the own writes out of the changes looked at on the next tick,
+        # but not the ones made by contact listeners
+        self.__change_tick = world.change_tick
+        if contacts is not None:
+            for (uid_a, uid_b), normal, depth in zip(*(a.tolist() for a in contacts)):
+                self.on_contact(world[uid_a], world[uid_b], tuple(normal), depth)
+            self.on_contact.flush()
+
+    def __tick_entities(self, world: World, cfg: Settings) -> Optional[Contacts]:
         gravity_accel = Vector2(0, cfg.gravity_force)
-        for e in world.query_entities(lambda e: e.has_components(BodyComponent, PositionComponent)):
-            # first, set the body position from position component
-            body = e[BodyComponent].get_body()
-            pos = e[PositionComponent]
-            body.position.x = pos.x
-            body.position.y = pos.y
-
-            # apply forces to bodies
-            apply_gravity(body, gravity_accel, cfg.physics_time_step)
-            apply_velocity(body, cfg.physics_time_step)
-
-            # update the position component from the body
-            e[PositionComponent].x = body.position.x
-            e[PositionComponent].y = body.position.y
+        simulated = []
+        for archetype in world.query_archetypes(BodyComponent, PositionComponent):
+            bodies = archetype.columns[BodyComponent]
+            positions = archetype.columns[PositionComponent]
+            for entity, body_comp, pos in zip(archetype.entities, bodies, positions):
+                # sleeping bodies cost nothing until woken up, which also
+                # happens when their position component is written by others or
+                # their velocity, zeroed on sleep, is changed in place
+                body = body_comp.get_body()
+                if body.sleeping:
+                    velocity = body.velocity
+                    if velocity.x == 0 and velocity.y == 0:
+                        continue
+                    body.wake()
+
+                # first, set the body position from position component
+                body.position.set(pos.x, pos.y)
+
+                # apply forces to bodies
+                apply_gravity(body, gravity_accel, cfg.physics_time_step)
+                apply_velocity(body, cfg.physics_time_step)
+
+                # update the position component from the body, which stamps
+                # it as changed
+                pos.x = body.position.x
+                pos.y = body.position.y
+                simulated.append((entity.uid, body))
+
+                if self.__broadphase is not None:
+                    self.__broadphase.update(entity.uid, *body.aabb)
+
+        contacts = None
+        if self.__broadphase is not None:
+            contacts = self.__collide(world, [uid for uid, _ in simulated])
+
+        # bodies come to rest only once the contacts cancelled their velocity
+        if cfg.sleep_enabled:
+            for _, body in simulated:
+                update_sleep(body, cfg.physics_time_step, cfg.sleep_velocity, cfg.sleep_delay)
+
+        return contacts
+
+    def __collide(self, world: World, moved: List[int]) -> Optional[Contacts]:
+        # gather the bodies of the candidate pairs involving the simulated
+        # ones into arrays, the same way the batched mode keeps them; pairs of
+        # sleeping bodies are never looked at
+        pairs = np.array(list(self.__broadphase.pairs(moved)), dtype=np.int64).reshape(-1, 2)
+        if not len(pairs):
+            return None
+        keys, rows = np.unique(pairs, return_inverse=True)
+        rows = rows.reshape(-1, 2)
+        bodies = [world[uid][BodyComponent].get_body() for uid in keys.tolist()]
+
+        bounds = np.array([body.aabb for body in bodies], dtype=np.float64)
+        hits, normals, depths = find_contacts(rows, bounds)
+        if not len(hits):
+            return None
+
+        position = bounds[:, :2].copy()
+        velocity = np.array([(body.velocity.x, body.velocity.y) for body in bodies], dtype=np.float64)
+        mass = np.array([body.mass for body in bodies], dtype=np.float64)
+        resolve_contacts(position, velocity, mass, rows[hits], normals, depths)
+
+        # write back the bodies pushed around, which wakes up the sleeping
+        # ones hit by awake ones, static ones stay
+        hit_rows = np.unique(rows[hits])
+        for row in hit_rows[mass[hit_rows] > 0].tolist():
+            body = bodies[row]
+            x, y = position[row].tolist()
+            body.position = Vector2(x, y)
+            body.velocity = Vector2(*velocity[row].tolist())
+            pos = world[int(keys[row])][PositionComponent]
+            pos.x = x
+            pos.y = y
+            self.__broadphase.update(int(keys[row]), *body.aabb)
+
+        return pairs[hits], normals, depths
+
+    def __tick_batched(self, world: World, cfg: Settings) -> Optional[Contacts]:
+        batch = self.__batch
+        batch.gather()
+        batch.integrate((0.0, cfg.gravity_force), cfg.physics_time_step)
+
+        contacts = None
+        if self.__broadphase is not None:
+            # only awake bodies can move to other cells, and only pairs
+            # involving them are looked at
+            bounds = batch.bounds()
+            awake = batch.awake
+            self.__broadphase.update_many(batch.keys[:awake], bounds[:awake], batch.cells[:awake])
+
+            pairs = np.array(list(self.__broadphase.pairs(batch.keys[:awake])), dtype=np.int64).reshape(-1, 2)
+            if len(pairs):
+                rows = batch.rows(pairs)
+                hits, normals, depths = find_contacts(rows, bounds)
+                resolve_contacts(batch.position, batch.velocity, batch.mass, rows[hits], normals, depths)
+                contacts = (pairs[hits], normals, depths)
+
+                # wake up sleeping bodies hit by awake ones, static ones stay
+                hit_rows = rows[hits].ravel()
+                hit_keys = pairs[hits].ravel()
+                woken = (hit_rows >= awake) & (batch.mass[hit_rows] > 0)
+                for key in hit_keys[woken].tolist():
+                    batch.wake(key)
+
+        batch.scatter()
+        world.mark_many_changed(batch.key[:batch.awake], PositionComponent)
+
+        if cfg.sleep_enabled:
+            batch.update_sleep(cfg.physics_time_step, cfg.sleep_velocity, cfg.sleep_delay)
+
+        return contacts
+
+    def wake(self, entity: Entity):
+        if self.__batch is not None and entity.uid in self.__batch:
+            self.__batch.wake(entity.uid)
+        else:
+            entity[BodyComponent].get_body().wake()
+
+    def close(self):
+        if isinstance(self.__batch, SharedBodyBatch):
+            self.__batch.close()
+
+    def on_entity_component_added(self, entity: Entity, comp: Any):
+        if self.__batch is not None and component_type(comp) in (BodyComponent, PositionComponent):
+            if entity.uid not in self.__batch and entity.has_components(BodyComponent, PositionComponent):
+                self.__batch.add(entity.uid, entity[BodyComponent].get_body(), entity[PositionComponent])
+
+    def on_entity_component_deleted(self, entity: Entity, comp: Any):
+        if component_type(comp) not in (BodyComponent, PositionComponent):
+            return
+
+        if self.__batch is not None and entity.uid in self.__batch:
+            self.__batch.remove(entity.uid)
+
+        if self.__broadphase is not None and entity.uid in self.__broadphase:
+            self.__broadphase.remove(entity.uid)
@@ -1,8 +1,12 @@
+from typing import Any, Dict, Set, Tuple
+
 import inject
 
+from hg.core.pool import component_type
 from hg.core.system import System
 from hg.core.world import Entity, World
 from hg.gfx.sprite_renderer.renderer import SpriteRenderer
+from hg.gfx.sprite_renderer.sprite import Sprite
 from hg.res.loaders.sprite_loader import SpriteLoader
 
 from ..components.sprite_component import SpriteComponent
@@ -11,56 +15,95 @@ from ..components.position_component import PositionComponent
 
 class SpriteRenderSystem(System):
 
+    reads = (SpriteComponent, PositionComponent)
+    writes = ()
+    # drives the renderer and loads textures
+    main_thread = True
+    headless = False
+
     def __init__(self):
-        self.__sprites = {}
+        self.__sprites: Dict[int, Tuple[str, Sprite]] = {}
+        # previous and current ticked position of each sprite, as
+        # (prev_x, prev_y, x, y), for interpolating between them
+        self.__positions: Dict[int, Tuple[float, float, float, float]] = {}
+        self.__moving: Set[int] = set()
+        self.__change_tick = 0
 
     @inject.autoparams()
     def tick(self, world: World, renderer: SpriteRenderer):
-        entities = world.query_entities(lambda e: e.has_components(SpriteComponent, PositionComponent))
-        own_uids = set(self.__sprites)
-        cur_uids = set(e.uid for e in entities)
-
-        in_common = own_uids.intersection(cur_uids)
-        to_destroy = own_uids.difference(cur_uids)
-        to_create = cur_uids.difference(own_uids)
-
-        # check current sprites for resource changes and mark them for
-        # destruction or replacement
-        for uid in in_common:
-            e = world[uid]
-            component = e[SpriteComponent]
-            resource, sprite = self.__sprites[uid]
-
-            if component.resource != resource:
-                to_destroy.add(uid)
-                if component.resource:
-                    to_create.add(uid)
-
-        # remove sprites from entities marked for destruction
-        for uid in to_destroy:
-            self.__destroy_sprite(uid)
+        since, self.__change_tick = self.__change_tick, world.change_tick
+
+        # create, replace or update the sprites of entities whose sprite
+        # component was added or changed since the last tick; sprites of
+        # entities losing either component are destroyed right away
+        for entity in world.changed_since(SpriteComponent, since):
+            if PositionComponent in entity:
+                self.__sync_sprite(entity)
 
-        # create and initialize sprites for new ones with a valid resource
-        for uid in to_create:
-            e = world[uid]
-            component = e[SpriteComponent]
-            if component.resource:
-                sprite = self.__create_sprite(uid, component.resource)
+        # move the sprites of entities whose position changed since the last
+        # tick, and settle the ones which stopped moving
+        moving = set()
+        for entity in world.changed_since(PositionComponent, since):
+            uid = entity.uid
+            if uid not in self.__sprites:
+                # the entity might have just got its position
+                if SpriteComponent in entity:
+                    self.__sync_sprite(entity)
+                continue
 
-        # update sprite positions
-        for uid in self.__sprites:
-            e = world[uid]
-            pos = e[PositionComponent]
-            sprite.x = int(round(pos.x))
-            sprite.y = int(round(pos.y))
+            pos = entity[PositionComponent]
+            self.__move_sprite(uid, pos.x, pos.y)
+            moving.add(uid)
+
+        for uid in self.__moving - moving:
+            if uid in self.__sprites:
+                _, _, x, y = self.__positions[uid]
+                self.__move_sprite(uid, x, y)
+        self.__moving = moving
+
+    def interpolate(self, alpha: float):
+        # settled sprites are in place already
+        for uid in self.__moving:
+            sprite = self.__sprites[uid][1]
+            prev_x, prev_y, x, y = self.__positions[uid]
+            sprite.move_to(int(round(prev_x + (x - prev_x) * alpha)), int(round(prev_y + (y - prev_y) * alpha)))
 
     def on_entity_deleted(self, entity: Entity):
         if entity.uid in self.__sprites:
             self.__destroy_sprite(entity.uid)
 
+    def on_entity_component_deleted(self, entity: Entity, comp: Any):
+        if entity.uid in self.__sprites and component_type(comp) in (SpriteComponent, PositionComponent):
+            self.__destroy_sprite(entity.uid)
+
+    def __sync_sprite(self, entity: Entity):
+        uid = entity.uid
+        component = entity[SpriteComponent]
+        current = self.__sprites.get(uid)
+        if current is not None:
+            resource, sprite = current
+            if component.resource == resource:
+                sprite.z = component.z
+                return
+            self.__destroy_sprite(uid)
+
+        if component.resource:
+            self.__create_sprite(uid, component.resource, component.z)
+            pos = entity[PositionComponent]
+            self.__move_sprite(uid, pos.x, pos.y)
+
+    def __move_sprite(self, uid: int, x: float, y: float):
+        prev = self.__positions.get(uid)
+        prev_x, prev_y = (x, y) if prev is None else prev[2:]
+        self.__positions[uid] = (prev_x, prev_y, x, y)
+
+        sprite = self.__sprites[uid][1]
+        sprite.move_to(int(round(x)), int(round(y)))
+
     @inject.autoparams()
-    def __create_sprite(self, uid: int, resource: str, loader: SpriteLoader, renderer: SpriteRenderer):
+    def __create_sprite(self, uid: int, resource: str, z: int, loader: SpriteLoader, renderer: SpriteRenderer):
         sprite = loader.load(resource)
+        sprite.z = z
         renderer.add_sprite(sprite)
         self.__sprites[uid] = (resource, sprite)
         return sprite
@@ -69,3 +112,5 @@ class SpriteRenderSystem(System):
     def __destroy_sprite(self, uid: int, renderer: SpriteRenderer):
         renderer.remove_sprite(self.__sprites[uid][1])
         self.__sprites.pop(uid)
+        self.__positions.pop(uid, None)
+        self.__moving.discard(uid)
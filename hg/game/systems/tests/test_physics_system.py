@@ -1,8 +1,10 @@
 import inject
 import pytest
 
+from hg.core.pool import ComponentPool
 from hg.core.system import SystemRegistry
 from hg.core.world import World
+from hg.math import Vector2
 
 from ...components.body_component import BodyComponent
 from ...components.position_component import PositionComponent
@@ -36,3 +38,333 @@ def test_objects_falling():
     assert e[BodyComponent].get_body().velocity.y == pytest.approx(1.0, 1)
     assert e[PositionComponent].x == 0
     assert e[PositionComponent].y == pytest.approx(1/2, 1)  # 1/2 * 1m/s^2 * 1.0s
+
+
+@pytest.mark.inject()
+def test_objects_falling_batched():
+    w = World()
+    systems = SystemRegistry(w)
+    physics = PhysicsSystem(batched=True)
+    systems.register_system(physics)
+    cfg = inject.instance(Settings)
+
+    e = w.add_entity(components=(
+        PositionComponent(),
+        BodyComponent(),
+    ))
+    static = w.add_entity(components=(
+        PositionComponent(),
+        BodyComponent(),
+    ))
+    static[BodyComponent].mass = 0
+    assert len(physics.batch) == 2
+
+    num_ticks = int(1.0 / cfg.physics_time_step)
+    for _ in range(num_ticks):
+        systems.tick_all()
+
+    assert e[BodyComponent].get_body().velocity.y == pytest.approx(1.0, 1)
+    assert e[PositionComponent].x == 0
+    assert e[PositionComponent].y == pytest.approx(1/2, 1)  # 1/2 * 1m/s^2 * 1.0s
+    assert static[PositionComponent].y == 0
+
+    w.del_entity(static)
+    assert len(physics.batch) == 1
+
+    # batch creation and deletion
+    burst = w.add_entities([(PositionComponent(), BodyComponent()) for _ in range(10)])
+    assert len(physics.batch) == 11
+    w.del_entities(burst)
+    assert len(physics.batch) == 1
+
+
+@pytest.mark.inject()
+def test_batched_body_changes():
+    w = World()
+    systems = SystemRegistry(w)
+    systems.register_system(PhysicsSystem(batched=True))
+    cfg = inject.instance(Settings)
+
+    e = w.add_entity(components=(PositionComponent(), BodyComponent()))
+    body = e[BodyComponent]
+    body.mass = 0
+    body.get_body().velocity = Vector2(100, 0)
+
+    num_ticks = int(1.0 / cfg.physics_time_step)
+    for _ in range(num_ticks):
+        systems.tick_all()
+
+    assert e[PositionComponent].x == pytest.approx(100 * num_ticks * cfg.physics_time_step)
+    assert e[PositionComponent].y == 0
+
+
+@pytest.mark.inject()
+def test_objects_falling_pooled():
+    w = World()
+    w.register_pool(ComponentPool(PositionComponent))
+    systems = SystemRegistry(w)
+    physics = PhysicsSystem(batched=True, cell_size=10)
+    systems.register_system(physics)
+
+    e = w.add_entity(components=(PositionComponent(), BodyComponent()))
+    assert e.uid in physics.batch
+
+    systems.tick_all()
+    assert e[PositionComponent].y > 0
+    assert e.uid in physics.broadphase
+
+    # deleting the pooled position takes the entity out of the simulation
+    e.del_component(PositionComponent)
+    assert e.uid not in physics.batch
+    assert e.uid not in physics.broadphase
+
+
+@pytest.mark.inject()
+def test_objects_falling_multiprocess():
+    w = World()
+    systems = SystemRegistry(w)
+    physics = PhysicsSystem(processes=2)
+    physics.batch.chunk_size = 4
+    systems.register_system(physics)
+    cfg = inject.instance(Settings)
+
+    entities = w.add_entities([(PositionComponent(x=i), BodyComponent()) for i in range(10)])
+
+    num_ticks = int(1.0 / cfg.physics_time_step)
+    for _ in range(num_ticks):
+        systems.tick_all()
+
+    for i, e in enumerate(entities):
+        assert e[PositionComponent].x == i
+        assert e[PositionComponent].y == pytest.approx(1/2, 1)
+
+    # the worker processes are shut down along with the registry
+    systems.close()
+    assert physics.batch.position is None
+
+
+@pytest.mark.inject()
+@pytest.mark.parametrize('batched', [False, True])
+def test_broadphase_tracking(batched):
+    w = World()
+    systems = SystemRegistry(w)
+    physics = PhysicsSystem(batched=batched, cell_size=10)
+    systems.register_system(physics)
+
+    a = w.add_entity(components=(PositionComponent(0, 0), BodyComponent()))
+    b = w.add_entity(components=(PositionComponent(5, 0), BodyComponent()))
+    c = w.add_entity(components=(PositionComponent(5, 100), BodyComponent()))
+    for e in (a, b, c):
+        e[BodyComponent].mass = 0
+
+    systems.tick_all()
+    assert list(physics.broadphase.pairs()) == [(a.uid, b.uid)]
+
+    w.del_entity(b)
+    assert b.uid not in physics.broadphase
+    assert list(physics.broadphase.pairs()) == []
+
+
+@pytest.mark.inject()
+@pytest.mark.parametrize('batched', [False, True])
+def test_collisions(mocker, batched):
+    w = World()
+    systems = SystemRegistry(w)
+    physics = PhysicsSystem(batched=batched, cell_size=16)
+    systems.register_system(physics)
+    contact = mocker.Mock()
+    physics.on_contact += contact
+
+    # a static floor
+    floor_body = BodyComponent()
+    floor_body.mass = 0
+    floor_body.size = Vector2(64, 8)
+    floor = w.add_entity(components=(PositionComponent(0, 10), floor_body))
+
+    # a box falling onto it
+    box_body = BodyComponent()
+    box_body.size = Vector2(8, 8)
+    box = w.add_entity(components=(PositionComponent(4, 0), box_body))
+
+    for _ in range(200):
+        systems.tick_all()
+
+    contact.assert_called()
+    a, b, normal, depth = contact.call_args[0]
+    assert {a.uid, b.uid} == {floor.uid, box.uid}
+    assert depth > 0
+
+    # the box lies on the floor, both are asleep
+    assert box[PositionComponent].y == pytest.approx(2, abs=0.1)
+    assert floor[PositionComponent].y == 10
+    assert not batched or physics.batch.awake == 0
+    assert box_body.get_body().sleeping
+    assert floor_body.get_body().sleeping
+
+    # another box falling on top wakes the sleeping one up
+    other_body = BodyComponent()
+    other_body.size = Vector2(8, 8)
+    other_body.get_body().velocity = Vector2(0, 20)
+    w.add_entity(components=(PositionComponent(4, -5.5), other_body))
+    systems.tick_all()
+    assert not box_body.get_body().sleeping
+
+
+@pytest.mark.inject()
+def test_sleeping_bodies_skipped():
+    w = World()
+    systems = SystemRegistry(w)
+    physics = PhysicsSystem()
+    systems.register_system(physics)
+    cfg = inject.instance(Settings)
+
+    body = BodyComponent()
+    body.mass = 0
+    e = w.add_entity(components=(PositionComponent(), body))
+
+    for _ in range(int(cfg.sleep_delay / cfg.physics_time_step) + 1):
+        systems.tick_all()
+    assert body.get_body().sleeping
+
+    # sleeping bodies aren't simulated until woken up
+    systems.tick_all()
+    assert body.get_body().sleeping
+
+    physics.wake(e)
+    body.get_body().velocity = Vector2(0, 10)
+    systems.tick_all()
+    assert e[PositionComponent].y > 0
+
+
+@pytest.mark.inject()
+@pytest.mark.parametrize('batched', [False, True])
+def test_sleeping_bodies_woken_by_moves(mocker, batched):
+    w = World()
+    systems = SystemRegistry(w)
+    physics = PhysicsSystem(batched=batched, cell_size=16)
+    systems.register_system(physics)
+    contact = mocker.Mock()
+    physics.on_contact += contact
+
+    floor_body = BodyComponent()
+    floor_body.mass = 0
+    floor_body.size = Vector2(64, 8)
+    w.add_entity(components=(PositionComponent(0, 10), floor_body))
+    wall_body = BodyComponent()
+    wall_body.mass = 0
+    wall_body.size = Vector2(8, 64)
+    w.add_entity(components=(PositionComponent(200, -100), wall_body))
+
+    box_body = BodyComponent()
+    box_body.size = Vector2(8, 8)
+    box = w.add_entity(components=(PositionComponent(4, 0), box_body))
+    for _ in range(200):
+        systems.tick_all()
+    assert box_body.get_body().sleeping
+
+    # moving a resting body wakes it up, it falls from its new position
+    box[PositionComponent].y = -500
+    systems.tick_all()
+    assert not box_body.get_body().sleeping
+    assert -500 < box[PositionComponent].y < -490
+    assert box_body.get_body().position.y == box[PositionComponent].y
+
+    # and collides at its new place
+    for _ in range(200):
+        systems.tick_all()
+    contact.reset_mock()
+    box[PositionComponent].x = 202
+    box[PositionComponent].y = -80
+    systems.tick_all()
+    contact.assert_called()
+    assert box.uid in physics.broadphase.query(200, -100, 208, -36)
+    assert box[PositionComponent].x != 202
+
+
+@pytest.mark.inject()
+@pytest.mark.parametrize('batched', [False, True])
+def test_resting_bodies_sleep(batched):
+    w = World()
+    systems = SystemRegistry(w)
+    systems.register_system(PhysicsSystem(batched=batched, cell_size=16))
+    cfg = inject.instance(Settings)
+    cfg.sleep_velocity = cfg.gravity_force * cfg.physics_time_step / 2
+
+    floor_body = BodyComponent()
+    floor_body.mass = 0
+    floor_body.size = Vector2(64, 8)
+    w.add_entity(components=(PositionComponent(0, 10), floor_body))
+    box_body = BodyComponent()
+    box_body.size = Vector2(8, 8)
+    w.add_entity(components=(PositionComponent(4, 0), box_body))
+
+    # contacts cancel the velocity gained from gravity each tick before
+    # bodies are checked for rest
+    for _ in range(200):
+        systems.tick_all()
+    assert box_body.get_body().sleeping
+
+
+@pytest.mark.inject()
+@pytest.mark.parametrize('batched', [False, True])
+def test_sleeping_bodies_woken_in_place(batched):
+    w = World()
+    systems = SystemRegistry(w)
+    systems.register_system(PhysicsSystem(batched=batched))
+    cfg = inject.instance(Settings)
+
+    body = BodyComponent()
+    body.mass = 0
+    e = w.add_entity(components=(PositionComponent(), body))
+    for _ in range(int(cfg.sleep_delay / cfg.physics_time_step) + 1):
+        systems.tick_all()
+    assert body.get_body().sleeping
+
+    body.get_body().velocity.x = 10
+    systems.tick_all()
+    assert not body.get_body().sleeping
+    assert e[PositionComponent].x > 0
+
+
+@pytest.mark.inject()
+@pytest.mark.parametrize('batched', [False, True])
+def test_slow_massless_bodies_keep_moving(batched):
+    w = World()
+    systems = SystemRegistry(w)
+    systems.register_system(PhysicsSystem(batched=batched))
+    cfg = inject.instance(Settings)
+
+    body = BodyComponent()
+    body.mass = 0
+    body.get_body().velocity = Vector2(0.05, 0)
+    e = w.add_entity(components=(PositionComponent(), body))
+    for _ in range(200):
+        systems.tick_all()
+
+    assert not body.get_body().sleeping
+    assert e[PositionComponent].x == pytest.approx(0.05 * 200 * cfg.physics_time_step)
+
+
+@pytest.mark.inject()
+@pytest.mark.parametrize('batched', [False, True])
+def test_sleeping_bodies_not_paired(mocker, batched):
+    w = World()
+    systems = SystemRegistry(w)
+    physics = PhysicsSystem(batched=batched, cell_size=16)
+    systems.register_system(physics)
+    cfg = inject.instance(Settings)
+
+    tiles = []
+    for i in range(10):
+        body = BodyComponent()
+        body.mass = 0
+        body.size = Vector2(8, 8)
+        tiles.append((PositionComponent(i * 8, 0), body))
+    w.add_entities(tiles)
+    for _ in range(int(cfg.sleep_delay / cfg.physics_time_step) + 1):
+        systems.tick_all()
+
+    # pairs are only searched for around the bodies still awake
+    pairs = mocker.spy(physics.broadphase, 'pairs')
+    systems.tick_all()
+    assert [list(call[0][0]) for call in pairs.call_args_list] == [[]]
@@ -92,3 +92,80 @@ def test_sprite_tracking(mocker):
 
     new_sprite_id = id(renderer.sprites[0])
     assert new_sprite_id != cur_sprite_id
+
+
+@pytest.mark.inject()
+def test_sprite_interpolation():
+    w = World()
+    sysreg = SystemRegistry(w)
+    sprite_sys = SpriteRenderSystem()
+    sysreg.register_system(sprite_sys)
+    renderer = inject.instance(SpriteRenderer)
+    resource = os.path.join(os.getcwd(), 'hg', 'res', 'loaders', 'tests', 'test_sprite_0.xml')
+
+    e = w.add_entity(components=(
+        SpriteComponent(resource=resource),
+        PositionComponent(10, 20),
+    ))
+    sysreg.tick_all()
+    sprite = renderer.sprites[0]
+
+    # a new sprite has no previous position to interpolate from
+    sprite_sys.interpolate(0.5)
+    assert (sprite.x, sprite.y) == (10, 20)
+
+    pos = e[PositionComponent]
+    pos.x = 20
+    pos.y = 0
+    sysreg.tick_all()
+    assert (sprite.x, sprite.y) == (20, 0)
+
+    sprite_sys.interpolate(0.0)
+    assert (sprite.x, sprite.y) == (10, 20)
+
+    sprite_sys.interpolate(0.25)
+    assert (sprite.x, sprite.y) == (12, 15)
+
+    # once the entity stops moving, the sprite settles at its position
+    sysreg.tick_all()
+    assert (sprite.x, sprite.y) == (20, 0)
+    sprite_sys.interpolate(0.25)
+    assert (sprite.x, sprite.y) == (20, 0)
+
+
+@pytest.mark.inject()
+def test_sprite_layers():
+    w = World()
+    sysreg = SystemRegistry(w)
+    sysreg.register_system(SpriteRenderSystem())
+    renderer = inject.instance(SpriteRenderer)
+    resource = os.path.join(os.getcwd(), 'hg', 'res', 'loaders', 'tests', 'test_sprite_0.xml')
+
+    w.add_entity(components=(SpriteComponent(resource=resource, z=1), PositionComponent()))
+    back = w.add_entity(components=(SpriteComponent(resource=resource), PositionComponent()))
+    sysreg.tick_all()
+    front_sprite, back_sprite = renderer.sprites[1], renderer.sprites[0]
+    assert (front_sprite.z, back_sprite.z) == (1, 0)
+
+    # layer changes are picked up on the next tick
+    back[SpriteComponent].z = 2
+    sysreg.tick_all()
+    assert list(renderer.sprites) == [front_sprite, back_sprite]
+
+
+@pytest.mark.inject()
+def test_sprites_batched_by_resource(mocker):
+    w = World()
+    sysreg = SystemRegistry(w)
+    sysreg.register_system(SpriteRenderSystem())
+    renderer = inject.instance(SpriteRenderer)
+    blit_batch = mocker.patch('hg.gfx.sprite_renderer.renderer.blit_batch')
+    resource = os.path.join(os.getcwd(), 'hg', 'res', 'loaders', 'tests', 'test_sprite_0.xml')
+
+    # sprites loaded from the same resource share their atlas, and are drawn
+    # all at once
+    w.add_entities([(SpriteComponent(resource=resource), PositionComponent(i, 0)) for i in range(200)])
+    sysreg.tick_all()
+    renderer.render()
+    blit_batch.assert_called_once()
+    assert len(blit_batch.call_args[0][2]) == 200
@@ -0,0 +1,105 @@
+import inject
+import pytest
+
+from hg.core.world import World
+from hg.game.components.body_component import BodyComponent
+from hg.game.components.position_component import PositionComponent
+from hg.game.components.sprite_component import SpriteComponent
+from hg.game.settings import Settings
+from hg.game.systems.physics_system import PhysicsSystem
+from hg.game.systems.sprite_render_system import SpriteRenderSystem
+from hg.math import Vector2
+
+from ..headless import HeadlessRunner, state_digest
+
+
+@pytest.fixture
+def no_injector():
+    inject.clear()
+    yield
+    inject.clear()
+
+
+def make_world() -> World:
+    w = World()
+    for i in range(10):
+        body = BodyComponent()
+        body.size = Vector2(4, 4)
+        w.add_entity(components=(
+            PositionComponent(i * 3.0, i * 0.5),
+            SpriteComponent(resource='sprite.xml'),
+            body,
+        ))
+
+    floor = BodyComponent()
+    floor.mass = 0.0
+    floor.size = Vector2(100, 10)
+    w.add_entity(components=(PositionComponent(-50, 40), floor))
+    return w
+
+
+def run_session(ticks: int, **settings) -> HeadlessRunner:
+    runner = HeadlessRunner(
+        make_world(),
+        systems=(PhysicsSystem(batched=True, cell_size=16), SpriteRenderSystem()),
+        settings=Settings(**settings))
+    runner.run(ticks)
+    return runner
+
+
+def test_headless_run(no_injector, mocker):
+    runner = run_session(100, physics_time_step=0.01)
+
+    # the injector is configured with the runner settings and rendering is
+    # skipped altogether
+    assert inject.instance(Settings) is runner.settings
+    assert runner.ticks == 100
+    assert runner.time == pytest.approx(1.0)
+
+    pos = next(runner.world.entities_with(SpriteComponent))[PositionComponent]
+    assert pos.y > 0
+
+    # the systems are closed along with the runner
+    physics = PhysicsSystem(processes=1)
+    close = mocker.spy(physics, 'close')
+    with HeadlessRunner(make_world(), systems=(physics,)) as runner:
+        runner.run(1)
+    close.assert_called_once_with()
+    assert physics.batch.position is None
+
+
+def test_headless_injected_settings(no_injector):
+    settings = Settings(physics_time_step=0.01)
+    inject.configure(lambda binder: binder.bind(Settings, settings))
+
+    # the runner takes the injected settings, and refuses other ones
+    assert HeadlessRunner(World()).settings is settings
+    assert HeadlessRunner(World(), settings=settings).settings is settings
+    with pytest.raises(ValueError):
+        HeadlessRunner(World(), settings=Settings())
+
+
+def test_headless_determinism(no_injector):
+    digest = run_session(200).digest()
+
+    for _ in range(3):
+        inject.clear()
+        assert run_session(200).digest() == digest
+
+    inject.clear()
+    assert run_session(201).digest() != digest
+
+
+def test_state_digest():
+    w = World()
+    e = w.add_entity(components=(PositionComponent(1, 2), SpriteComponent()))
+    digest = state_digest(w)
+    positions = state_digest(w, PositionComponent)
+
+    e[SpriteComponent].resource = 'sprite.xml'
+    assert state_digest(w) != digest
+    assert state_digest(w, PositionComponent) == positions
+
+    # a bit of a difference is enough to tell the states apart
+    e[PositionComponent].x = 1.0000000000000002
+    assert state_digest(w, PositionComponent) != positions
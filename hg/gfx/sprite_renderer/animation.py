@@ -0,0 +1,285 @@
+from typing import Any, Collection, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .sprite import Frame, Image, Sprite
+
+# per-row shape and type of the batch arrays
+ARRAYS = {
+    'phase': ((), np.float64),
+    'rate': ((), np.float64),
+    'index': ((), np.int64),
+    'count': ((), np.int64),
+    'first': ((), np.int64),
+    'loop': ((), np.bool_),
+    'atlas': ((), np.int64),
+    'played': ((), np.float64),
+    'position': ((2,), np.int64),
+}
+
+# animations are identified by their atlas id and the rects of their frames
+AnimationKey = Tuple[int, Tuple[Tuple[int, int, int, int], ...]]
+
+
+def advance_arrays(
+        phase: np.ndarray,
+        rate: np.ndarray,
+        index: np.ndarray,
+        count: np.ndarray,
+        loop: np.ndarray,
+        time: np.ndarray):
+    """
+    Advance the animations described by given arrays by given times, in
+    milliseconds.
+
+    Phases are the fraction of the current frame elapsed, rates are in frames
+    per millisecond, and the index of an animation past its last frame marks
+    it as finished.
+    """
+    phase += np.maximum(time, 0) * rate
+    steps = np.floor(phase)
+    phase -= steps
+    index += steps.astype(np.int64)
+
+    # looping animations wrap around, others stop past their last frame
+    wrap = loop & (count > 0)
+    np.remainder(index, count, out=index, where=wrap)
+    np.minimum(index, count, out=index, where=~wrap)
+
+
+class AnimationBatch:
+    """
+    Structure-of-arrays storage for the animations of many sprites, advanced
+    all at once.
+
+    Each row holds the animation state of a sprite along with its position,
+    and the frames of all the animations are resolved on addition into rows of
+    a single frame table, shared by sprites with the same atlas and frames.
+    Frame rows and atlases are reference counted, and released once no
+    sprite in the batch uses them anymore.
+    Animations are advanced to a given time, each row from the time it was
+    last advanced to, so that rows left out of some updates catch up on the
+    next one including them.
+
+    Sprites in the batch delegate their animation state to it and get it back
+    when removed, and notify it of changes to their animation parameters.
+    Positions are only refreshed from the sprites by `move`.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.phase: np.ndarray
+        self.rate: np.ndarray
+        self.index: np.ndarray
+        self.count: np.ndarray
+        self.first: np.ndarray
+        self.loop: np.ndarray
+        self.atlas: np.ndarray
+        self.played: np.ndarray
+        self.position: np.ndarray
+        for name, (shape, dtype) in ARRAYS.items():
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+
+        self.sprites: List[Sprite] = []
+
+        # atlases by id, with the count of rows using each one; the ids of
+        # released atlases are reused
+        self.atlases: List[Optional[Image]] = []
+        self.__atlas_refs: List[int] = []
+        self.__atlas_ids: Dict[int, int] = {}
+        self.__free_atlases: List[int] = []
+
+        # frame table as rows of (x, y, w, h), grown on demand, with the first
+        # row and the count of rows using each distinct animation, and the
+        # first rows of released animations by their frame count
+        self.frames = np.zeros((64, 4), dtype=np.int64)
+        self.__frame_rows = 0
+        self.__animations: Dict[AnimationKey, List[int]] = {}
+        self.__free_frames: Dict[int, List[int]] = {}
+
+        self.__rows: Dict[Sprite, int] = {}
+        self.__keys: List[Optional[AnimationKey]] = []
+
+    def add(self, sprite: Sprite, time: float) -> int:
+        row = len(self.sprites)
+        if row == len(self.phase):
+            self.__grow(2 * row)
+
+        self.phase[row] = sprite.phase
+        self.index[row] = sprite.frame_index
+        self.played[row] = time
+        self.position[row] = (sprite.x, sprite.y)
+        self.__keys.append(None)
+        self.__load(row, sprite)
+
+        self.sprites.append(sprite)
+        self.__rows[sprite] = row
+        sprite.animation = self
+        return row
+
+    def update(self, sprite: Sprite):
+        # take the changed animation parameters of a sprite
+        self.__load(self.__rows[sprite], sprite)
+
+    def remove(self, sprite: Sprite):
+        row = self.__rows.pop(sprite)
+
+        # write the final state back to the sprite leaving the batch
+        sprite.animation = None
+        sprite.phase = float(self.phase[row])
+        sprite.frame_index = int(self.index[row])
+        self.__release(row)
+
+        last = len(self.sprites) - 1
+        if row != last:
+            for name in ARRAYS:
+                array = getattr(self, name)
+                array[row] = array[last]
+            moved = self.sprites[row] = self.sprites[last]
+            self.__keys[row] = self.__keys[last]
+            self.__rows[moved] = row
+        self.sprites.pop()
+        self.__keys.pop()
+
+    def advance(self, time: float, rows: Optional[np.ndarray] = None):
+        if rows is None:
+            rows = slice(0, len(self.sprites))
+        self.__advance(rows, time - self.played[rows])
+        self.played[rows] = time
+
+    def play(self, sprite: Sprite, time: float):
+        self.__advance(np.array([self.__rows[sprite]]), np.array([time], dtype=np.float64))
+
+    def stop(self, sprite: Sprite):
+        row = self.__rows[sprite]
+        self.phase[row] = 0.0
+        self.index[row] = 0
+
+    def frame(self, sprite: Sprite) -> Optional[Frame]:
+        row = self.__rows[sprite]
+        index = int(self.index[row])
+        if index >= self.count[row]:
+            return None
+        return Frame(*self.frames[self.first[row] + index].tolist())
+
+    def move(self, sprites: Collection[Sprite]):
+        self.position[self.rows(sprites, len(sprites))] = [(sprite.x, sprite.y) for sprite in sprites]
+
+    def rows(self, sprites: Iterable[Sprite], count: int) -> np.ndarray:
+        rows = self.__rows
+        return np.fromiter((rows[sprite] for sprite in sprites), dtype=np.int64, count=count)
+
+    def quads(self, rows: np.ndarray, offset_x: int = 0, offset_y: int = 0) -> List[Tuple[Image, np.ndarray]]:
+        """
+        Build the quads drawing the current frames of given rows, as (n, 6)
+        arrays of (src_x, src_y, w, h, dst_x, dst_y), one for each run of
+        consecutive rows sharing an atlas, so that the drawing order of the
+        rows is kept.
+        """
+        rows = rows[self.index[rows] < self.count[rows]]
+        if not len(rows):
+            return []
+
+        quads = np.empty((len(rows), 6), dtype=np.int64)
+        quads[:, :4] = self.frames[self.first[rows] + self.index[rows]]
+        quads[:, 4:] = self.position[rows] - (offset_x, offset_y)
+
+        atlas = self.atlas[rows]
+        starts = [0] + (np.nonzero(atlas[1:] != atlas[:-1])[0] + 1).tolist()
+        ends = starts[1:] + [len(rows)]
+        return [(self.atlases[atlas[start]], quads[start:end]) for start, end in zip(starts, ends)]
+
+    def __advance(self, rows: Any, time: np.ndarray):
+        phase = self.phase[rows]
+        index = self.index[rows]
+        advance_arrays(phase, self.rate[rows], index, self.count[rows], self.loop[rows], time)
+        self.phase[rows] = phase
+        self.index[rows] = index
+
+    def __load(self, row: int, sprite: Sprite):
+        self.rate[row] = sprite.fps / 1000.0 if sprite.fps > 0 else 0.0
+        self.count[row] = len(sprite.frames)
+        self.loop[row] = sprite.loop
+
+        # take the new animation before releasing the old one, which is
+        # likely the same
+        key = self.__acquire(sprite)
+        self.__release(row)
+        self.__keys[row] = key
+        if key is None:
+            self.first[row] = 0
+            self.atlas[row] = -1
+        else:
+            self.first[row] = self.__animations[key][0]
+            self.atlas[row] = key[0]
+
+    def __acquire(self, sprite: Sprite) -> Optional[AnimationKey]:
+        if not sprite.frames:
+            return None
+
+        atlas = sprite.sheet.atlas
+        atlas_id = self.__atlas_ids.get(id(atlas))
+        if atlas_id is None:
+            if self.__free_atlases:
+                atlas_id = self.__free_atlases.pop()
+                self.atlases[atlas_id] = atlas
+            else:
+                atlas_id = len(self.atlases)
+                self.atlases.append(atlas)
+                self.__atlas_refs.append(0)
+            self.__atlas_ids[id(atlas)] = atlas_id
+        self.__atlas_refs[atlas_id] += 1
+
+        frames = sprite.sheet.frames
+        key = (atlas_id, tuple((f.x, f.y, f.w, f.h) for f in (frames[name] for name in sprite.frames)))
+        animation = self.__animations.get(key)
+        if animation is None:
+            animation = self.__animations[key] = [self.__alloc_frames(key[1]), 0]
+        animation[1] += 1
+        return key
+
+    def __release(self, row: int):
+        key = self.__keys[row]
+        if key is None:
+            return
+        self.__keys[row] = None
+
+        animation = self.__animations[key]
+        animation[1] -= 1
+        if animation[1] == 0:
+            del self.__animations[key]
+            self.__free_frames.setdefault(len(key[1]), []).append(animation[0])
+
+        atlas_id = key[0]
+        self.__atlas_refs[atlas_id] -= 1
+        if self.__atlas_refs[atlas_id] == 0:
+            del self.__atlas_ids[id(self.atlases[atlas_id])]
+            self.atlases[atlas_id] = None
+            self.__free_atlases.append(atlas_id)
+
+    def __alloc_frames(self, rects: Tuple[Tuple[int, int, int, int], ...]) -> int:
+        # reuse the rows of a released animation with as many frames
+        free = self.__free_frames.get(len(rects))
+        if free:
+            first = free.pop()
+        else:
+            first = self.__frame_rows
+            self.__frame_rows += len(rects)
+            if self.__frame_rows > len(self.frames):
+                frames = np.zeros((max(2 * len(self.frames), self.__frame_rows), 4), dtype=np.int64)
+                frames[:first] = self.frames[:first]
+                self.frames = frames
+        self.frames[first:first + len(rects)] = rects
+        return first
+
+    def __grow(self, capacity: int):
+        for name in ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def __len__(self) -> int:
+        return len(self.sprites)
+
+    def __contains__(self, sprite: Sprite) -> bool:
+        return sprite in self.__rows
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Camera:
+
+    x: int = 0
+    y: int = 0
+    width: int = 0
+    height: int = 0
@@ -1,16 +1,98 @@
-from typing import List, Optional, Tuple
+import ctypes
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
 
+import numpy as np
 import sdl2
 
-from .sprite import Image, Sprite
-
-Rect = Tuple[int, int, int, int]
-
+from hg.spatial import SpatialHash
 
-def blit(rndr: sdl2.SDL_Renderer, image: Image, src_rect: Rect, dst_rect: Rect):
-    src = sdl2.SDL_Rect(*src_rect)
-    dst = sdl2.SDL_Rect(*dst_rect)
-    sdl2.SDL_RenderCopy(rndr, image.data, src, dst)
+from .animation import AnimationBatch
+from .camera import Camera
+from .sprite import Image, Sprite
+from .sprite_list import SpriteList
+
+# atlas region and screen position of a sprite frame: (src_x, src_y, w, h,
+# dst_x, dst_y)
+Quad = Tuple[int, int, int, int, int, int]
+
+# quads as a sequence or as the rows of an (n, 6) array
+Quads = Union[Sequence[Quad], np.ndarray]
+
+# memory layout of SDL_Vertex
+VERTEX_DTYPE = np.dtype([
+    ('x', np.float32),
+    ('y', np.float32),
+    ('color', np.uint8, 4),
+    ('u', np.float32),
+    ('v', np.float32),
+])
+
+# corners of a quad in drawing order, as offsets in units of its size, and
+# the two triangles covering it
+QUAD_CORNERS = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float32)
+QUAD_INDICES = np.array([0, 1, 2, 0, 2, 3], dtype=np.int32)
+
+# whether the loaded SDL library supports SDL_RenderGeometry, determined on
+# first use
+geometry_support: Optional[bool] = None
+
+
+def build_geometry(quads: Quads, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build the vertices and indices of textured triangles drawing given quads
+    from an atlas of given size.
+    """
+    count = len(quads)
+    if isinstance(quads, np.ndarray):
+        quads_array = quads.astype(np.float32)
+    else:
+        quads_array = np.fromiter(chain.from_iterable(quads), dtype=np.float32, count=6 * count).reshape(-1, 6)
+    corners = QUAD_CORNERS * quads_array[:, np.newaxis, 2:4]
+
+    # fill the vertex fields as float columns, the color being opaque white
+    raw = np.empty((count, 4, 5), dtype=np.float32)
+    raw[..., 0:2] = quads_array[:, np.newaxis, 4:6] + corners
+    raw.view(np.uint32)[..., 2] = 0xFFFFFFFF
+    raw[..., 3:5] = (quads_array[:, np.newaxis, 0:2] + corners) / np.array((width, height), dtype=np.float32)
+    vertices = raw.reshape(-1, 5).view(VERTEX_DTYPE).ravel()
+
+    indices = QUAD_INDICES + 4 * np.arange(count, dtype=np.int32)[:, np.newaxis]
+    return vertices, indices.ravel()
+
+
+def blit_batch(rndr: sdl2.SDL_Renderer, image: Image, quads: Quads):
+    global geometry_support
+    if geometry_support is None:
+        # SDL_RenderGeometry was added in SDL 2.0.18
+        version = sdl2.SDL_version()
+        sdl2.SDL_GetVersion(ctypes.byref(version))
+        geometry_support = (
+            hasattr(sdl2, 'SDL_RenderGeometry') and (version.major, version.minor, version.patch) >= (2, 0, 18))
+
+    if geometry_support:
+        # submit the whole batch at once
+        vertices, indices = build_geometry(quads, image.width, image.height)
+        sdl2.SDL_RenderGeometry(
+            rndr,
+            image.data,
+            vertices.ctypes.data_as(ctypes.POINTER(sdl2.SDL_Vertex)),
+            len(vertices),
+            indices.ctypes.data_as(ctypes.POINTER(ctypes.c_int)),
+            len(indices))
+        return
+
+    # otherwise copy the quads one by one, reusing the same pair of rects,
+    # SDL still merges consecutive copies from the same texture into batches
+    src = sdl2.SDL_Rect()
+    dst = sdl2.SDL_Rect()
+    copy = sdl2.SDL_RenderCopy
+    if isinstance(quads, np.ndarray):
+        quads = quads.tolist()
+    for src.x, src.y, src.w, src.h, dst.x, dst.y in quads:
+        dst.w = src.w
+        dst.h = src.h
+        copy(rndr, image.data, src, dst)
 
 
 def get_time() -> int:
@@ -18,42 +100,105 @@ def get_time() -> int:
 
 
 class SpriteRenderer:
-
-    def __init__(self, sdl_renderer: sdl2.SDL_Renderer):
-        self.sprites: List[Sprite] = []
+    """
+    Animates and draws sprites in the layer order of the sprite list,
+    batching runs of consecutive sprites sharing an atlas.
+
+    Animations are advanced all at once by an animation batch, which also
+    builds the quads to draw. With a camera set, only the sprites overlapping
+    its view are animated and drawn, found through a grid of the sprite
+    bounds kept up to date as they move. Sprites out of view don't play at
+    all and catch up on the time they missed once they come back into view.
+    """
+
+    def __init__(self, sdl_renderer: sdl2.SDL_Renderer, camera: Optional[Camera] = None, cell_size: int = 256):
+        self.sprites = SpriteList()
+        self.animation = AnimationBatch()
+        self.camera = camera
         self.__renderer = sdl_renderer
-        self.__last_time: Optional[int] = None
+
+        self.__grid = SpatialHash(cell_size)
+        self.__next_key = 0
+        self.__keys: Dict[Sprite, int] = {}
+        self.__by_key: Dict[int, Sprite] = {}
+
+        # sprites moved since the last render, and the ones whose cells in the
+        # grid are out of date
+        self.__moved: Set[Sprite] = set()
+        self.__unplaced: Set[Sprite] = set()
+
+        # batch rows of all the sprites in drawing order, rebuilt when sprites
+        # are added, removed or restacked
+        self.__draw_rows: Optional[np.ndarray] = None
 
     def add_sprite(self, sprite: Sprite):
-        if sprite not in self.sprites:
-            self.sprites.append(sprite)
+        if not self.sprites.add(sprite):
+            return
+
+        key = self.__next_key
+        self.__next_key += 1
+        self.__keys[sprite] = key
+        self.__by_key[key] = sprite
+        self.__unplaced.add(sprite)
+        self.__draw_rows = None
+        self.animation.add(sprite, get_time())
+        sprite.on_move = self.__moved.add
+        sprite.on_restack = self.__restack
 
     def remove_sprite(self, sprite: Sprite):
-        if sprite in self.sprites:
-            self.sprites.remove(sprite)
+        if not self.sprites.discard(sprite):
+            return
+
+        key = self.__keys.pop(sprite)
+        del self.__by_key[key]
+        self.__grid.remove(key)
+        self.__moved.discard(sprite)
+        self.__unplaced.discard(sprite)
+        self.__draw_rows = None
+        self.animation.remove(sprite)
+        sprite.on_move = None
+        sprite.on_restack = None
 
     def render(self):
-        if self.__last_time is None:
-            self.__last_time = get_time()
-
         now = get_time()
-        time_delta = now - self.__last_time
-        self.__last_time = now
-
-        for sprite in self.sprites:
-            sprite.play(time_delta)
-
-            if sprite.current_frame is not None:
-                frame = sprite.current_frame
-                src_x = frame.x
-                src_y = frame.y
-                w = frame.w
-                h = frame.h
-                dst_x = sprite.x
-                dst_y = sprite.y
-                blit(
-                    self.__renderer,
-                    sprite.sheet.atlas,
-                    (src_x, src_y, w, h),
-                    (dst_x, dst_y, w, h)
-                )
+        if self.__moved:
+            self.animation.move(self.__moved)
+            self.__unplaced.update(self.__moved)
+            self.__moved.clear()
+
+        if self.__draw_rows is None:
+            self.__draw_rows = self.animation.rows(self.sprites, len(self.sprites))
+        rows = self.__draw_rows
+
+        camera = self.camera
+        if camera is None:
+            offset_x = offset_y = 0
+        else:
+            # keep the drawing order by filtering the rows of all the sprites
+            # rather than sorting the visible ones
+            visible = np.zeros(len(self.animation), dtype=np.bool_)
+            visible[self.animation.rows(self.__visible(camera), -1)] = True
+            rows = rows[visible[rows]]
+            offset_x = camera.x
+            offset_y = camera.y
+
+        self.animation.advance(now, rows)
+        for atlas, quads in self.animation.quads(rows, offset_x, offset_y):
+            blit_batch(self.__renderer, atlas, quads)
+
+    def __restack(self, sprite: Sprite):
+        if self.sprites.restack(sprite):
+            self.__draw_rows = None
+
+    def __visible(self, camera: Camera) -> List[Sprite]:
+        grid = self.__grid
+        if self.__unplaced:
+            keys = self.__keys
+            for sprite in self.__unplaced:
+                w, h = sprite.size
+                grid.update(keys[sprite], sprite.x, sprite.y, sprite.x + w, sprite.y + h)
+            self.__unplaced.clear()
+
+        by_key = self.__by_key
+        found = grid.query(camera.x, camera.y, camera.x + camera.width, camera.y + camera.height)
+        return [by_key[key] for key in found]
@@ -1,4 +1,4 @@
-from typing import Sequence, Optional, Dict, Any
+from typing import Sequence, Optional, Dict, Any, Callable, Tuple
 from dataclasses import dataclass
 
 
@@ -29,46 +29,148 @@ class SpriteSheet:
 
 class Sprite:
 
-    def __init__(self, x: int, y: int, sheet: SpriteSheet, frames: Sequence, fps: float, loop: bool):
-        self.x = x
-        self.y = y
-        self.sheet = sheet
-        self.fps = fps
-        self.frames = frames
-        self.loop = loop
+    def __init__(self, x: int, y: int, sheet: SpriteSheet, frames: Sequence, fps: float, loop: bool, z: int = 0):
+        # called with the sprite when moved or resized, and when its layer
+        # changes
+        self.on_move: Optional[Callable[['Sprite'], None]] = None
+        self.on_restack: Optional[Callable[['Sprite'], None]] = None
+
+        # animation state, as the fraction of the current frame elapsed and
+        # the index of the frame, past the last one once finished; sprites in
+        # an animation batch keep it there instead, and are notified of
+        # changes to the animation parameters
+        self.phase = 0.0
+        self.frame_index = 0
+        self.animation: Optional[Any] = None
+
+        self.__x = x
+        self.__y = y
+        self.__z = z
+        self.__sheet = sheet
+        self.__frames = frames
+        self.__fps = fps
+        self.__loop = loop
+        self.__resolve()
 
-        self.__time_acc = 0.0
-        self.__frame_seq = None
-        self.__frame: Optional[Any] = None
+    @property
+    def x(self) -> int:
+        return self.__x
+
+    @x.setter
+    def x(self, value: int):
+        self.__x = value
+        if self.on_move is not None:
+            self.on_move(self)
+
+    @property
+    def y(self) -> int:
+        return self.__y
+
+    @y.setter
+    def y(self, value: int):
+        self.__y = value
+        if self.on_move is not None:
+            self.on_move(self)
+
+    def move_to(self, x: int, y: int):
+        self.__x = x
+        self.__y = y
+        if self.on_move is not None:
+            self.on_move(self)
+
+    @property
+    def z(self) -> int:
+        return self.__z
+
+    @z.setter
+    def z(self, value: int):
+        if value != self.__z:
+            self.__z = value
+            if self.on_restack is not None:
+                self.on_restack(self)
+
+    @property
+    def sheet(self) -> SpriteSheet:
+        return self.__sheet
+
+    @sheet.setter
+    def sheet(self, value: SpriteSheet):
+        # a new sheet or frames restart the animation
+        self.__sheet = value
+        self.__resolve()
+        self.stop()
+        self.__changed(resized=True)
 
+    @property
+    def frames(self) -> Sequence:
+        return self.__frames
+
+    @frames.setter
+    def frames(self, value: Sequence):
+        self.__frames = value
+        self.__resolve()
         self.stop()
+        self.__changed(resized=True)
+
+    @property
+    def fps(self) -> float:
+        return self.__fps
+
+    @fps.setter
+    def fps(self, value: float):
+        self.__fps = value
+        self.__changed()
+
+    @property
+    def loop(self) -> bool:
+        return self.__loop
+
+    @loop.setter
+    def loop(self, value: bool):
+        self.__loop = value
+        self.__changed()
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        # extent of the largest frame
+        return self.__size
+
+    def __resolve(self):
+        self.__frame_list = [self.__sheet.frames[name] for name in self.__frames] if self.__frames else []
+        if self.__frame_list:
+            self.__size = (max(f.w for f in self.__frame_list), max(f.h for f in self.__frame_list))
+        else:
+            self.__size = (0, 0)
+
+    def __changed(self, resized: bool = False):
+        if self.animation is not None:
+            self.animation.update(self)
+        if resized and self.on_move is not None:
+            self.on_move(self)
 
     @property
     def current_frame(self) -> Optional[Frame]:
-        if self.__frame is not None:
-            return self.sheet.frames[self.__frame]
+        if self.animation is not None:
+            return self.animation.frame(self)
+        if self.frame_index < len(self.__frame_list):
+            return self.__frame_list[self.frame_index]
         return None
 
     def play(self, time: float):
-        if self.fps > 0 and time > 0:
-            self.__time_acc += time
-            frame_time = 1000.0 / self.fps
-            while self.__time_acc >= frame_time:
-                self.__time_acc -= frame_time
-                self.__frame = self.__next_frame()
+        if self.animation is not None:
+            self.animation.play(self, time)
+        elif self.fps > 0 and time > 0:
+            self.phase += time * self.fps / 1000.0
+            steps = int(self.phase)
+            self.phase -= steps
+            if self.loop and self.frames:
+                self.frame_index = (self.frame_index + steps) % len(self.frames)
+            else:
+                self.frame_index = min(self.frame_index + steps, len(self.frames))
 
     def stop(self):
-        self.__time_acc = 0.0
-        self.__frame_seq = (f for f in self.frames) if self.frames else None
-        self.__frame = self.__next_frame()
-
-    def __next_frame(self) -> Optional[Frame]:
-        if self.__frame_seq is not None:
-            try:
-                return next(self.__frame_seq)
-            except StopIteration:
-                if self.loop:
-                    self.stop()
-                    return self.__frame
-
-        return None
+        if self.animation is not None:
+            self.animation.stop(self)
+        else:
+            self.phase = 0.0
+            self.frame_index = 0
@@ -0,0 +1,91 @@
+from bisect import insort
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Tuple
+
+from .sprite import Sprite
+
+
+class SpriteList:
+    """
+    Set of sprites ordered by layer.
+
+    Sprites are grouped in layers by their `z`, drawn from the lowest to the
+    highest, and keep the order they were added in within a layer. Layers are
+    dictionaries keyed by sprites, which makes additions, removals and
+    membership checks constant time, and a sprite whose `z` changed is just
+    moved on top of its new layer by `restack`, without sorting anything.
+    Positional access is linear and meant for inspection only.
+    """
+
+    def __init__(self):
+        self.__layers: Dict[int, Dict[Sprite, None]] = {}
+        self.__zs: List[int] = []
+
+        # drawing order of each sprite, as its layer and a sequence number
+        # increasing with every insertion
+        self.__order: Dict[Sprite, Tuple[int, int]] = {}
+        self.__seq = 0
+
+    def add(self, sprite: Sprite) -> bool:
+        if sprite in self.__order:
+            return False
+        self.__insert(sprite)
+        return True
+
+    def discard(self, sprite: Sprite) -> bool:
+        order = self.__order.pop(sprite, None)
+        if order is None:
+            return False
+        self.__remove(sprite, order[0])
+        return True
+
+    def restack(self, sprite: Sprite) -> bool:
+        order = self.__order.get(sprite)
+        if order is None or order[0] == sprite.z:
+            return False
+        self.__remove(sprite, order[0])
+        self.__insert(sprite)
+        return True
+
+    def order(self, sprite: Sprite) -> Tuple[int, int]:
+        return self.__order[sprite]
+
+    def clear(self):
+        self.__layers.clear()
+        self.__zs.clear()
+        self.__order.clear()
+
+    def __insert(self, sprite: Sprite):
+        z = sprite.z
+        layer = self.__layers.get(z)
+        if layer is None:
+            layer = self.__layers[z] = {}
+            insort(self.__zs, z)
+        layer[sprite] = None
+        self.__order[sprite] = (z, self.__seq)
+        self.__seq += 1
+
+    def __remove(self, sprite: Sprite, z: int):
+        layer = self.__layers[z]
+        del layer[sprite]
+        if not layer:
+            del self.__layers[z]
+            self.__zs.remove(z)
+
+    def __getitem__(self, index: int) -> Sprite:
+        size = len(self.__order)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('sprite index out of range')
+        return next(islice(self, index, None))
+
+    def __iter__(self) -> Iterator[Sprite]:
+        layers = self.__layers
+        return chain.from_iterable([layers[z] for z in self.__zs])
+
+    def __len__(self) -> int:
+        return len(self.__order)
+
+    def __contains__(self, sprite: Sprite) -> bool:
+        return sprite in self.__order
@@ -0,0 +1,116 @@
+import random
+
+import numpy as np
+import pytest
+
+from ..animation import AnimationBatch
+from ..sprite import Frame, Image, Sprite, SpriteSheet
+
+
+@pytest.fixture
+def spritesheet():
+    frames = {f'frame{i}': Frame(16 * i, 0, 16, 16) for i in range(4)}
+    return SpriteSheet(Image('atlas.png', 64, 16), frames)
+
+
+def make_sprite(sheet, count, fps, loop, x=0):
+    return Sprite(x=x, y=0, sheet=sheet, frames=[f'frame{i}' for i in range(count)], fps=fps, loop=loop)
+
+
+def test_animation_batch(spritesheet):
+    batch = AnimationBatch(capacity=2)
+    looping = make_sprite(spritesheet, 3, 2.0, True)
+    once = make_sprite(spritesheet, 3, 2.0, False)
+    still = make_sprite(spritesheet, 2, 0.0, True)
+    empty = make_sprite(spritesheet, 0, 2.0, True)
+    for sprite in (looping, once, still, empty):
+        batch.add(sprite, 0)
+
+    # 3.5 frames in, looping animations wrap around while others finish
+    batch.advance(1750)
+    assert batch.index[:4].tolist() == [0, 3, 0, 0]
+    assert looping.current_frame == Frame(0, 0, 16, 16)
+    assert once.current_frame is None
+    assert still.current_frame == Frame(0, 0, 16, 16)
+    assert empty.current_frame is None
+
+    # rows left out of an update catch up on the next one
+    batch.advance(2000, np.array([2]))
+    batch.advance(2250)
+    assert looping.current_frame == Frame(16, 0, 16, 16)
+
+    # sprites get their state back when removed
+    batch.remove(looping)
+    assert looping.animation is None
+    assert (looping.phase, looping.frame_index) == (0.5, 1)
+    assert looping.current_frame == Frame(16, 0, 16, 16)
+    assert len(batch) == 3
+    assert batch.sprites[0] is empty
+    assert empty.current_frame is None
+
+
+def test_animation_batch_matches_sprites(spritesheet):
+    rng = random.Random(0)
+    params = [(rng.randint(0, 4), rng.choice((0.0, 1.0, 7.5, 30.0)), rng.random() < 0.5) for _ in range(50)]
+    alone = [make_sprite(spritesheet, *p) for p in params]
+    batched = [make_sprite(spritesheet, *p) for p in params]
+    batch = AnimationBatch()
+    for sprite in batched:
+        batch.add(sprite, 0)
+
+    now = 0
+    for _ in range(100):
+        delta = rng.choice((0, 16, 40, 250, 2000))
+        now += delta
+        batch.advance(now)
+        for sprite in alone:
+            sprite.play(delta)
+
+        assert [s.current_frame for s in batched] == [s.current_frame for s in alone]
+
+
+def test_animation_batch_quads(spritesheet):
+    other = SpriteSheet(Image('other.png', 64, 16), spritesheet.frames)
+    batch = AnimationBatch()
+    sprites = [
+        make_sprite(spritesheet, 1, 1.0, True, x=0),
+        make_sprite(other, 2, 1.0, True, x=1),
+        make_sprite(spritesheet, 0, 1.0, True, x=2),
+        make_sprite(spritesheet, 2, 1.0, True, x=3),
+    ]
+    for sprite in sprites:
+        batch.add(sprite, 0)
+
+    # same animations share their frames
+    first = batch.first[:4].tolist()
+    assert len(set(first[:2] + first[3:])) == 3
+    assert batch.first[batch.add(make_sprite(other, 2, 2.0, False), 0)] == first[1]
+
+    sprites[1].move_to(5, 6)
+    batch.move([sprites[1]])
+    quads = batch.quads(batch.rows(sprites, len(sprites)), 1, 1)
+    assert [(atlas, q.tolist()) for atlas, q in quads] == [
+        (spritesheet.atlas, [[0, 0, 16, 16, -1, -1]]),
+        (other.atlas, [[0, 0, 16, 16, 4, 5]]),
+        (spritesheet.atlas, [[0, 0, 16, 16, 2, -1]]),
+    ]
+
+
+def test_animation_batch_releases(spritesheet):
+    batch = AnimationBatch()
+    for _ in range(5):
+        # sprites with the same atlas and frames share their frame rows
+        sprites = [make_sprite(spritesheet, 2, 1.0, True) for _ in range(10)]
+        sprites += [make_sprite(SpriteSheet(Image('other.png', 64, 16), spritesheet.frames), 3, 1.0, True)]
+        for sprite in sprites:
+            batch.add(sprite, 0)
+        assert len(set(batch.first[:len(batch)].tolist())) == 2
+        assert sum(atlas is not None for atlas in batch.atlases) == 2
+
+        # released frames and atlases are reused by later sprites
+        sprites[0].frames = ['frame3']
+        for sprite in sprites:
+            batch.remove(sprite)
+        assert len(batch) == 0
+        assert batch.atlases == [None, None]
+        assert len(batch.frames) == 64
@@ -0,0 +1,75 @@
+import pytest
+
+from ..sprite import Sprite
+from ..sprite_list import SpriteList
+
+
+def make_sprites(count):
+    return [Sprite(x=i, y=0, sheet=None, frames=(), fps=0.0, loop=False) for i in range(count)]
+
+
+def test_sprite_list():
+    a, b, c = make_sprites(3)
+    sprites = SpriteList()
+
+    assert sprites.add(a)
+    assert sprites.add(b)
+    assert sprites.add(c)
+    assert not sprites.add(b)
+
+    assert len(sprites) == 3
+    assert list(sprites) == [a, b, c]
+    assert sprites[0] is a
+    assert sprites[-1] is c
+    with pytest.raises(IndexError):
+        sprites[3]
+
+    # removals keep the order of the remaining sprites
+    assert sprites.discard(b)
+    assert not sprites.discard(b)
+    assert b not in sprites
+    assert list(sprites) == [a, c]
+
+    # re-added sprites go last
+    sprites.add(b)
+    assert list(sprites) == [a, c, b]
+
+    sprites.clear()
+    assert len(sprites) == 0
+
+
+def test_sprite_list_mass_removal():
+    all_sprites = make_sprites(10000)
+    sprites = SpriteList()
+    for sprite in all_sprites:
+        sprites.add(sprite)
+
+    for sprite in all_sprites[::2]:
+        sprites.discard(sprite)
+
+    assert list(sprites) == all_sprites[1::2]
+
+
+def test_sprite_list_layers():
+    a, b, c, d = make_sprites(4)
+    a.z = 1
+    c.z = -1
+    sprites = SpriteList()
+    for sprite in (a, b, c, d):
+        sprites.add(sprite)
+        sprite.on_restack = sprites.restack
+
+    # lower layers first, insertion order within a layer
+    assert list(sprites) == [c, b, d, a]
+    assert sprites.order(b) < sprites.order(d) < sprites.order(a)
+
+    # restacked sprites go on top of their new layer
+    b.z = 1
+    assert list(sprites) == [c, d, a, b]
+    c.z = 0
+    assert list(sprites) == [d, c, a, b]
+    assert not sprites.restack(c)
+
+    sprites.discard(a)
+    sprites.discard(b)
+    assert list(sprites) == [d, c]
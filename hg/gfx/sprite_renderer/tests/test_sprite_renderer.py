@@ -1,8 +1,10 @@
 from unittest.mock import ANY
 
+import numpy as np
 import pytest
 
 from .. import renderer
+from ..camera import Camera
 from ..sprite import Frame, Sprite, SpriteSheet
 
 
@@ -22,7 +24,14 @@ def spritesheet(mocker):
 
 @pytest.fixture
 def blit_mock(mocker):
-    return mocker.patch.object(renderer, 'blit', mocker.Mock())
+    mock = mocker.Mock()
+
+    # record the quads as tuples, whether given as a sequence or an array
+    def blit_batch(rndr, image, quads):
+        mock(rndr, image, [tuple(quad) for quad in np.asarray(quads).tolist()])
+
+    mocker.patch.object(renderer, 'blit_batch', blit_batch)
+    return mock
 
 
 @pytest.fixture
@@ -52,15 +61,13 @@ def test_empty_sprite(mocker, spritesheet, blit_mock, time_mock):
         loop=True)
 
     rndr.add_sprite(sprite)
-    play = mocker.spy(sprite, 'play')
 
     for second in range(10):
         time_mock.time = second * 1000
         rndr.render()
 
     blit_mock.assert_not_called()
-    play.assert_called()
-    assert play.call_count == 10
+    assert sprite.current_frame is None
 
 
 @pytest.mark.inject()
@@ -81,8 +88,7 @@ def test_sprite_play_once(mocker, spritesheet, blit_mock, time_mock):
     blit_mock.assert_called_with(
         ANY,
         spritesheet.atlas,
-        (0, 0, 32, 32),
-        (-10, -20, 32, 32)
+        [(0, 0, 32, 32, -10, -20)]
     )
 
     # T+1s: 'plane1'
@@ -91,8 +97,7 @@ def test_sprite_play_once(mocker, spritesheet, blit_mock, time_mock):
     blit_mock.assert_called_with(
         ANY,
         spritesheet.atlas,
-        (32, 0, 32, 32),
-        (-10, -20, 32, 32)
+        [(32, 0, 32, 32, -10, -20)]
     )
 
     # T+2s: 'plane2'
@@ -101,8 +106,7 @@ def test_sprite_play_once(mocker, spritesheet, blit_mock, time_mock):
     blit_mock.assert_called_with(
         ANY,
         spritesheet.atlas,
-        (64, 0, 32, 32),
-        (-10, -20, 32, 32)
+        [(64, 0, 32, 32, -10, -20)]
     )
 
     # T+3s: animation finished, sprite not rendered
@@ -130,8 +134,7 @@ def test_sprite_play_loop(mocker, spritesheet, blit_mock, time_mock):
     blit_mock.assert_called_with(
         ANY,
         spritesheet.atlas,
-        (0, 32, 16, 16),
-        (10, 20, 16, 16)
+        [(0, 32, 16, 16, 10, 20)]
     )
 
     # T+0.5s: 'fire1':
@@ -140,8 +143,7 @@ def test_sprite_play_loop(mocker, spritesheet, blit_mock, time_mock):
     blit_mock.assert_called_with(
         ANY,
         spritesheet.atlas,
-        (16, 32, 16, 16),
-        (10, 20, 16, 16)
+        [(16, 32, 16, 16, 10, 20)]
     )
 
     # T+1s: 'fire2':
@@ -150,8 +152,7 @@ def test_sprite_play_loop(mocker, spritesheet, blit_mock, time_mock):
     blit_mock.assert_called_with(
         ANY,
         spritesheet.atlas,
-        (32, 32, 16, 16),
-        (10, 20, 16, 16)
+        [(32, 32, 16, 16, 10, 20)]
     )
 
     # T+1.5s: 'fire0', loop from the beginning
@@ -160,6 +161,138 @@ def test_sprite_play_loop(mocker, spritesheet, blit_mock, time_mock):
     blit_mock.assert_called_with(
         ANY,
         spritesheet.atlas,
-        (0, 32, 16, 16),
-        (10, 20, 16, 16)
+        [(0, 32, 16, 16, 10, 20)]
     )
+
+
+def test_sprite_batching(mocker, spritesheet, blit_mock, time_mock):
+    rndr = renderer.SpriteRenderer(mocker.Mock())
+    other_sheet = SpriteSheet(mocker.Mock(), spritesheet.frames)
+
+    def add_sprite(sheet, frame, x, z=0):
+        rndr.add_sprite(Sprite(x=x, y=0, sheet=sheet, frames=(frame,), fps=1.0, loop=True, z=z))
+
+    add_sprite(spritesheet, 'plane0', 0)
+    add_sprite(spritesheet, 'fire1', 1)
+    add_sprite(other_sheet, 'fire0', 2)
+    add_sprite(other_sheet, 'plane1', 3)
+    add_sprite(spritesheet, 'plane2', 4)
+
+    # a batch per run of sprites sharing an atlas, in drawing order
+    rndr.render()
+    assert blit_mock.call_args_list == [
+        mocker.call(ANY, spritesheet.atlas, [(0, 0, 32, 32, 0, 0), (16, 32, 16, 16, 1, 0)]),
+        mocker.call(ANY, other_sheet.atlas, [(0, 32, 16, 16, 2, 0), (32, 0, 32, 32, 3, 0)]),
+        mocker.call(ANY, spritesheet.atlas, [(64, 0, 32, 32, 4, 0)]),
+    ]
+
+
+@pytest.mark.parametrize('camera', [None, Camera(0, 0, 100, 100)])
+def test_sprite_layers_across_atlases(mocker, spritesheet, blit_mock, time_mock, camera):
+    rndr = renderer.SpriteRenderer(mocker.Mock(), camera=camera)
+    other_sheet = SpriteSheet(mocker.Mock(), spritesheet.frames)
+    rndr.add_sprite(Sprite(x=0, y=0, sheet=spritesheet, frames=('plane0',), fps=1.0, loop=True, z=0))
+    rndr.add_sprite(Sprite(x=2, y=0, sheet=spritesheet, frames=('plane2',), fps=1.0, loop=True, z=2))
+    rndr.add_sprite(Sprite(x=1, y=0, sheet=other_sheet, frames=('plane1',), fps=1.0, loop=True, z=1))
+
+    # sprites sharing an atlas aren't merged across a layer in between
+    rndr.render()
+    assert blit_mock.call_args_list == [
+        mocker.call(ANY, spritesheet.atlas, [(0, 0, 32, 32, 0, 0)]),
+        mocker.call(ANY, other_sheet.atlas, [(32, 0, 32, 32, 1, 0)]),
+        mocker.call(ANY, spritesheet.atlas, [(64, 0, 32, 32, 2, 0)]),
+    ]
+
+
+@pytest.mark.parametrize('camera', [None, Camera(0, 0, 100, 100)])
+def test_sprite_layers(mocker, spritesheet, blit_mock, time_mock, camera):
+    rndr = renderer.SpriteRenderer(mocker.Mock(), camera=camera)
+    front = Sprite(x=0, y=0, sheet=spritesheet, frames=('plane0',), fps=1.0, loop=True, z=1)
+    back = Sprite(x=1, y=0, sheet=spritesheet, frames=('plane1',), fps=1.0, loop=True)
+    rndr.add_sprite(front)
+    rndr.add_sprite(back)
+
+    rndr.render()
+    blit_mock.assert_called_with(ANY, spritesheet.atlas, [(32, 0, 32, 32, 1, 0), (0, 0, 32, 32, 0, 0)])
+
+    back.z = 2
+    rndr.render()
+    blit_mock.assert_called_with(ANY, spritesheet.atlas, [(0, 0, 32, 32, 0, 0), (32, 0, 32, 32, 1, 0)])
+
+
+def test_sprite_culling(mocker, spritesheet, blit_mock, time_mock):
+    rndr = renderer.SpriteRenderer(mocker.Mock(), camera=Camera(100, 100, 200, 100), cell_size=64)
+    visible = Sprite(x=150, y=120, sheet=spritesheet, frames=('plane0',), fps=1.0, loop=True)
+    hidden = Sprite(x=500, y=120, sheet=spritesheet, frames=('fire0',), fps=1.0, loop=True)
+    rndr.add_sprite(visible)
+    rndr.add_sprite(hidden)
+
+    # sprites are drawn relative to the camera, the ones out of view are
+    # neither played nor drawn
+    time_mock.time = 1000
+    rndr.render()
+    blit_mock.assert_called_once_with(ANY, spritesheet.atlas, [(0, 0, 32, 32, 50, 20)])
+    assert rndr.animation.played.tolist()[:2] == [1000, 0]
+
+    # moving sprites or the camera changes what's in view
+    hidden.move_to(200, 150)
+    rndr.camera.x = 0
+    rndr.render()
+    blit_mock.assert_called_with(ANY, spritesheet.atlas, [(0, 0, 32, 32, 150, 20), (0, 32, 16, 16, 200, 50)])
+
+    rndr.remove_sprite(hidden)
+    hidden.move_to(0, 0)
+    rndr.render()
+    blit_mock.assert_called_with(ANY, spritesheet.atlas, [(0, 0, 32, 32, 150, 20)])
+
+
+def test_sprite_culling_catch_up(mocker, spritesheet, blit_mock, time_mock):
+    rndr = renderer.SpriteRenderer(mocker.Mock(), camera=Camera(0, 0, 100, 100))
+    sprite = Sprite(x=1000, y=0, sheet=spritesheet, frames=('fire0', 'fire1', 'fire2'), fps=2.0, loop=True)
+    rndr.add_sprite(sprite)
+    rndr.render()
+
+    # out of view for 2.5 seconds, then shown on the frame it would have
+    # reached by playing all along
+    time_mock.time = 2500
+    rndr.render()
+    sprite.move_to(0, 0)
+    rndr.render()
+    blit_mock.assert_called_once_with(ANY, spritesheet.atlas, [(32, 32, 16, 16, 0, 0)])
+
+
+@pytest.mark.parametrize('camera', [None, Camera(0, 0, 100, 100)])
+def test_sprite_changes(mocker, spritesheet, blit_mock, time_mock, camera):
+    rndr = renderer.SpriteRenderer(mocker.Mock(), camera=camera)
+    sprite = Sprite(x=200, y=0, sheet=spritesheet, frames=('plane0', 'plane1'), fps=1.0, loop=False)
+    rndr.add_sprite(sprite)
+
+    # plain attribute writes are picked up on the next render
+    sprite.x = 10
+    sprite.y = 20
+    rndr.render()
+    blit_mock.assert_called_with(ANY, spritesheet.atlas, [(0, 0, 32, 32, 10, 20)])
+
+    sprite.fps = 2.0
+    time_mock.time = 500
+    rndr.render()
+    blit_mock.assert_called_with(ANY, spritesheet.atlas, [(32, 0, 32, 32, 10, 20)])
+
+    # changing the frames restarts the animation
+    sprite.frames = ('fire0', 'fire1')
+    sprite.loop = True
+    time_mock.time = 1000
+    rndr.render()
+    blit_mock.assert_called_with(ANY, spritesheet.atlas, [(16, 32, 16, 16, 10, 20)])
+
+
+def test_build_geometry():
+    vertices, indices = renderer.build_geometry([(4, 8, 8, 4, 10, 20), (0, 0, 16, 16, 0, 0)], 16, 16)
+
+    assert vertices.dtype == renderer.VERTEX_DTYPE
+    assert vertices.dtype.itemsize == 20
+    assert vertices[['x', 'y']].tolist()[:4] == [(10, 20), (18, 20), (18, 24), (10, 24)]
+    assert vertices[['u', 'v']].tolist()[:4] == [(0.25, 0.5), (0.75, 0.5), (0.75, 0.75), (0.25, 0.75)]
+    assert vertices[['u', 'v']].tolist()[4:] == [(0, 0), (1, 0), (1, 1), (0, 1)]
+    assert (vertices['color'] == 255).all()
+    assert indices.tolist() == [0, 1, 2, 0, 2, 3, 4, 5, 6, 4, 6, 7]
@@ -1,25 +1,156 @@
-from gem.vector import Vector
+from typing import Iterator, Optional, Union
 
+import numpy as np
 
-class Vector2(Vector):
+
+class Vector2:
+    """
+    Mutable 2D vector.
+
+    Arithmetic operators return new vectors, while the augmented assignments
+    and the `i*` methods update the vector in place without allocating.
+    """
+
+    __slots__ = ('x', 'y')
 
     def __init__(self, x: float = 0.0, y: float = 0.0):
-        super().__init__(2)
         self.x = x
         self.y = y
 
-    @property
-    def x(self) -> float:
-        return self.vector[0]
+    def set(self, x: float, y: float) -> 'Vector2':
+        self.x = x
+        self.y = y
+        return self
+
+    def copy(self) -> 'Vector2':
+        return Vector2(self.x, self.y)
+
+    def dot(self, other: 'Vector2') -> float:
+        return self.x * other.x + self.y * other.y
+
+    def magnitude_squared(self) -> float:
+        return self.x * self.x + self.y * self.y
+
+    def magnitude(self) -> float:
+        return (self.x * self.x + self.y * self.y) ** 0.5
+
+    def iadd_scaled(self, other: 'Vector2', scale: float) -> 'Vector2':
+        self.x += other.x * scale
+        self.y += other.y * scale
+        return self
+
+    def __add__(self, other: 'Vector2') -> 'Vector2':
+        if not isinstance(other, Vector2):
+            return NotImplemented
+        return Vector2(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other: 'Vector2') -> 'Vector2':
+        if not isinstance(other, Vector2):
+            return NotImplemented
+        return Vector2(self.x - other.x, self.y - other.y)
+
+    def __mul__(self, scalar: float) -> 'Vector2':
+        if not isinstance(scalar, (int, float)):
+            return NotImplemented
+        return Vector2(self.x * scalar, self.y * scalar)
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> 'Vector2':
+        return Vector2(-self.x, -self.y)
+
+    def __iadd__(self, other: 'Vector2') -> 'Vector2':
+        if not isinstance(other, Vector2):
+            return NotImplemented
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other: 'Vector2') -> 'Vector2':
+        if not isinstance(other, Vector2):
+            return NotImplemented
+        self.x -= other.x
+        self.y -= other.y
+        return self
 
-    @x.setter
-    def x(self, value: float):
-        self.vector[0] = value
+    def __imul__(self, scalar: float) -> 'Vector2':
+        if not isinstance(scalar, (int, float)):
+            return NotImplemented
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Vector2):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    __hash__ = None  # type: ignore
+
+    def __iter__(self) -> Iterator[float]:
+        yield self.x
+        yield self.y
+
+    def __copy__(self) -> 'Vector2':
+        return Vector2(self.x, self.y)
+
+    def __repr__(self) -> str:
+        return f'Vector2({self.x!r}, {self.y!r})'
+
+
+class Vector2Array:
+    """
+    Batch of 2D vectors stored as rows of an (n, 2) NumPy array, with
+    vectorized in-place operations over all of them at once.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, size: int = 0, data: Optional[np.ndarray] = None):
+        self.data = np.zeros((size, 2)) if data is None else data
 
     @property
-    def y(self) -> float:
-        return self.vector[1]
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    def iadd_scaled(
+            self,
+            other: Union['Vector2Array', Vector2, np.ndarray],
+            scale: Union[float, np.ndarray]) -> 'Vector2Array':
+        if isinstance(scale, np.ndarray) and scale.ndim == 1:
+            scale = scale[:, np.newaxis]
+        if isinstance(other, Vector2):
+            self.data += np.multiply((other.x, other.y), scale)
+        else:
+            self.data += np.multiply(self.__array(other), scale)
+        return self
+
+    def __iadd__(self, other: Union['Vector2Array', np.ndarray]) -> 'Vector2Array':
+        self.data += self.__array(other)
+        return self
+
+    def __isub__(self, other: Union['Vector2Array', np.ndarray]) -> 'Vector2Array':
+        self.data -= self.__array(other)
+        return self
+
+    def __imul__(self, scalar: float) -> 'Vector2Array':
+        self.data *= scalar
+        return self
+
+    def __getitem__(self, index: int) -> Vector2:
+        x, y = self.data[index].tolist()
+        return Vector2(x, y)
+
+    def __setitem__(self, index: int, value: Vector2):
+        self.data[index] = (value.x, value.y)
+
+    def __len__(self) -> int:
+        return len(self.data)
 
-    @y.setter
-    def y(self, value: float):
-        self.vector[1] = value
+    @staticmethod
+    def __array(other: Union['Vector2Array', np.ndarray]) -> np.ndarray:
+        return other.data if isinstance(other, Vector2Array) else other
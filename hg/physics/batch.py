@@ -0,0 +1,273 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from hg.core.pool import ComponentPool, ComponentView
+from hg.math import Vector2
+from hg.spatial import EMPTY_RANGE
+
+from .body import Body
+
+# per-row shape and type of the batch arrays
+ARRAYS = {
+    'position': ((2,), np.float64),
+    'velocity': ((2,), np.float64),
+    'size': ((2,), np.float64),
+    'mass': ((), np.float64),
+    'sleep_time': ((), np.float64),
+    'slots': ((), np.int64),
+    'cells': ((4,), np.int64),
+    'key': ((), np.int64),
+}
+
+
+def integrate_arrays(
+        position: np.ndarray,
+        velocity: np.ndarray,
+        mass: np.ndarray,
+        gravity_accel: Tuple[float, float],
+        time: float):
+    velocity[mass > 0] += np.multiply(gravity_accel, time)
+    position += velocity * time
+
+
+class RowVector(Vector2):
+    """
+    Vector of a batched body, standing for its row of one of the vector
+    arrays of the batch. Writes go straight to the batch and wake the body
+    up.
+    """
+
+    __slots__ = ('_batch', '_name', '_key')
+
+    def __init__(self, batch: 'BodyBatch', name: str, key: int):
+        self._batch = batch
+        self._name = name
+        self._key = key
+
+    @property  # type: ignore
+    def x(self) -> float:
+        return self._batch.read(self._key, self._name, 0)
+
+    @x.setter
+    def x(self, value: float):
+        self._batch.write(self._key, self._name, value, 0)
+
+    @property  # type: ignore
+    def y(self) -> float:
+        return self._batch.read(self._key, self._name, 1)
+
+    @y.setter
+    def y(self, value: float):
+        self._batch.write(self._key, self._name, value, 1)
+
+
+class BodyBatch:
+    """
+    Structure-of-arrays storage for many bodies, integrated all at once.
+
+    Each row holds the position, velocity, size and mass of a body, plus a target
+    object with `x` and `y` attributes the positions are gathered from and
+    scattered back to. When all the targets are views of the same component
+    pool, gathering and scattering operate directly on the pool columns.
+
+    Rows are partitioned into awake bodies first and sleeping ones after them,
+    so that all the per-tick work is done on the leading `awake` rows only.
+
+    Bodies in the batch read and write their state directly from and to their
+    rows, and get it back when removed.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.position: np.ndarray
+        self.velocity: np.ndarray
+        self.size: np.ndarray
+        self.mass: np.ndarray
+        self.sleep_time: np.ndarray
+        self.slots: np.ndarray
+        self.cells: np.ndarray
+        # keys of the rows, as an array for vectorized use along with `keys`
+        self.key: np.ndarray
+        for name, (shape, dtype) in ARRAYS.items():
+            setattr(self, name, self.allocate(name, (capacity,) + shape, dtype))
+
+        self.bodies: List[Body] = []
+        self.targets: List[Any] = []
+        self.keys: List[int] = []
+        self.awake = 0
+
+        self.__rows: Dict[int, int] = {}
+        self.__pool: Optional[ComponentPool] = None
+        self.__unpooled = 0
+
+    def add(self, key: int, body: Body, target: Any) -> int:
+        row = len(self.keys)
+        if row == len(self.mass):
+            self.__grow(2 * row)
+
+        self.position[row] = (target.x, target.y)
+        self.velocity[row] = (body.velocity.x, body.velocity.y)
+        self.size[row] = (body.size.x, body.size.y)
+        self.mass[row] = body.mass
+        self.sleep_time[row] = body.sleep_time
+        self.cells[row] = EMPTY_RANGE
+        self.key[row] = key
+        if self.__is_pooled(target):
+            self.__pool = target.pool
+            self.slots[row] = target.slot
+        else:
+            self.__unpooled += 1
+        self.bodies.append(body)
+        self.targets.append(target)
+        self.keys.append(key)
+        self.__rows[key] = row
+        body.attach(
+            self, key, RowVector(self, 'position', key), RowVector(self, 'velocity', key), RowVector(self, 'size', key))
+
+        if not body.sleeping:
+            self.__swap(row, self.awake)
+            self.awake += 1
+            row = self.awake - 1
+
+        return row
+
+    def remove(self, key: int):
+        row = self.__rows[key]
+
+        # hand the final state back to the body leaving the batch
+        self.bodies[row].detach()
+        if not self.__is_pooled(self.targets[row]):
+            self.__unpooled -= 1
+
+        if row < self.awake:
+            self.awake -= 1
+            self.__swap(row, self.awake)
+            row = self.awake
+
+        self.__swap(row, len(self.keys) - 1)
+        self.__rows.pop(key)
+        self.bodies.pop()
+        self.targets.pop()
+        self.keys.pop()
+        if not self.keys:
+            self.__pool = None
+
+    def sleep(self, key: int):
+        row = self.__rows[key]
+        if row < self.awake:
+            self.awake -= 1
+            self.__swap(row, self.awake)
+            self.velocity[self.awake] = 0.0
+            self.sleep_time[self.awake] = 0.0
+            self.bodies[self.awake].sleeping = True
+
+    def wake(self, key: int):
+        row = self.__rows[key]
+        if row >= self.awake:
+            self.__swap(row, self.awake)
+            self.sleep_time[self.awake] = 0.0
+            self.bodies[self.awake].sleeping = False
+            self.awake += 1
+
+    def update_sleep(self, time: float, sleep_velocity: float, sleep_delay: float) -> List[int]:
+        n = self.awake
+        velocity = self.velocity[:n]
+        sleep_time = self.sleep_time[:n]
+        speed_squared = np.einsum('ij,ij->i', velocity, velocity)
+        resting = (speed_squared < sleep_velocity * sleep_velocity) & ((self.mass[:n] > 0) | (speed_squared == 0))
+        sleep_time[resting] += time
+        sleep_time[~resting] = 0.0
+
+        # put bodies to sleep from the last row backwards, so that swapping
+        # them out of the awake partition doesn't move the pending ones
+        keys = [self.keys[row] for row in np.nonzero(sleep_time >= sleep_delay)[0][::-1].tolist()]
+        for key in keys:
+            self.sleep(key)
+        return keys
+
+    def gather(self):
+        n = self.awake
+        if n and self.__unpooled == 0:
+            slots = self.slots[:n]
+            self.position[:n, 0] = self.__pool.columns['x'][slots]
+            self.position[:n, 1] = self.__pool.columns['y'][slots]
+        elif n:
+            targets = self.targets[:n]
+            self.position[:n, 0] = [t.x for t in targets]
+            self.position[:n, 1] = [t.y for t in targets]
+
+    def scatter(self):
+        n = self.awake
+        if n and self.__unpooled == 0:
+            slots = self.slots[:n]
+            self.__pool.columns['x'][slots] = self.position[:n, 0]
+            self.__pool.columns['y'][slots] = self.position[:n, 1]
+            return
+
+        for target, (x, y) in zip(self.targets, self.position[:n].tolist()):
+            target.x = x
+            target.y = y
+
+    def integrate(self, gravity_accel: Tuple[float, float], time: float):
+        n = self.awake
+        integrate_arrays(self.position[:n], self.velocity[:n], self.mass[:n], gravity_accel, time)
+
+    def bounds(self) -> np.ndarray:
+        n = len(self.keys)
+        position = self.position[:n]
+        return np.hstack((position, position + self.size[:n]))
+
+    def rows(self, keys: np.ndarray) -> np.ndarray:
+        rows = self.__rows
+        return np.fromiter((rows[key] for key in keys.flat), dtype=np.int64, count=keys.size).reshape(keys.shape)
+
+    def allocate(self, name: str, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+        return np.zeros(shape, dtype=dtype)
+
+    def release(self, name: str, array: np.ndarray):
+        pass
+
+    def read(self, key: int, name: str, axis: Optional[int] = None) -> float:
+        array = getattr(self, name)
+        row = self.__rows[key]
+        return float(array[row] if axis is None else array[row, axis])
+
+    def write(self, key: int, name: str, value: float, axis: Optional[int] = None):
+        array = getattr(self, name)
+        row = self.__rows[key]
+        if axis is None:
+            array[row] = value
+        else:
+            array[row, axis] = value
+        self.wake(key)
+
+    def __swap(self, a: int, b: int):
+        if a == b:
+            return
+
+        for name in ARRAYS:
+            array = getattr(self, name)
+            array[[a, b]] = array[[b, a]]
+
+        for items in (self.bodies, self.targets, self.keys):
+            items[a], items[b] = items[b], items[a]
+
+        self.__rows[self.keys[a]] = a
+        self.__rows[self.keys[b]] = b
+
+    def __grow(self, capacity: int):
+        for name in ARRAYS:
+            old = getattr(self, name)
+            new = self.allocate(name, (capacity,) + old.shape[1:], old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+            self.release(name, old)
+
+    def __is_pooled(self, target: Any) -> bool:
+        return isinstance(target, ComponentView) and self.__pool in (None, target.pool)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.__rows
@@ -1,15 +1,120 @@
 from hg.math import Vector2
-from copy import copy
-from typing import Optional
+from typing import Any, Optional, Tuple
 
 
 class Body:
 
-    position: Vector2 = Vector2(0.0, 0.0)
-    velocity: Vector2 = Vector2(0.0, 0.0)
-    mass: float
+    def __init__(
+            self,
+            position: Optional[Vector2] = None,
+            velocity: Optional[Vector2] = None,
+            mass: float = 1.0,
+            size: Optional[Vector2] = None):
+        self.__position = position or Vector2(0.0, 0.0)
+        self.__velocity = velocity or Vector2(0.0, 0.0)
+        self.__size = size or Vector2(0.0, 0.0)
+        self.__mass = mass
 
-    def __init__(self, position: Optional[Vector2] = None, velocity: Optional[Vector2] = None, mass: float = 1.0):
-        self.position = position or copy(Body.position)
-        self.velocity = velocity or copy(Body.velocity)
-        self.mass = mass
+        # resting bodies are put to sleep and skipped by the simulation until
+        # they're woken up, either explicitly, by assigning them a new
+        # position, velocity or mass, or by changing their velocity in place
+        self.sleeping = False
+        self.sleep_time = 0.0
+
+        # body batch holding the state of the body while simulated by one,
+        # with the key of the body in it; the vectors of the body are views of
+        # its batch row meanwhile, writing through them wakes the body up
+        self.batch: Optional[Any] = None
+        self.batch_key = 0
+
+    @property
+    def position(self) -> Vector2:
+        return self.__position
+
+    @position.setter
+    def position(self, value: Vector2):
+        if self.batch is not None:
+            self.__position.set(value.x, value.y)
+            return
+
+        self.__position = value
+        if self.sleeping:
+            self.wake()
+
+    @property
+    def velocity(self) -> Vector2:
+        return self.__velocity
+
+    @velocity.setter
+    def velocity(self, value: Vector2):
+        if self.batch is not None:
+            self.__velocity.set(value.x, value.y)
+            return
+
+        self.__velocity = value
+        if self.sleeping:
+            self.wake()
+
+    @property
+    def size(self) -> Vector2:
+        return self.__size
+
+    @size.setter
+    def size(self, value: Vector2):
+        if self.batch is not None:
+            self.__size.set(value.x, value.y)
+        else:
+            self.__size = value
+
+    @property
+    def mass(self) -> float:
+        if self.batch is not None:
+            return self.batch.read(self.batch_key, 'mass')
+        return self.__mass
+
+    @mass.setter
+    def mass(self, value: float):
+        if self.batch is not None:
+            self.batch.write(self.batch_key, 'mass', value)
+            return
+
+        self.__mass = value
+        if self.sleeping:
+            self.wake()
+
+    @property
+    def aabb(self) -> Tuple[float, float, float, float]:
+        x, y = self.__position.x, self.__position.y
+        return (x, y, x + self.__size.x, y + self.__size.y)
+
+    def attach(self, batch: Any, key: int, position: Vector2, velocity: Vector2, size: Vector2):
+        self.batch = batch
+        self.batch_key = key
+        self.__position = position
+        self.__velocity = velocity
+        self.__size = size
+
+    def detach(self):
+        # take the state back from the batch
+        self.__mass = self.mass
+        self.__position = self.__position.copy()
+        self.__velocity = self.__velocity.copy()
+        self.__size = self.__size.copy()
+        self.batch = None
+
+    def sleep(self):
+        if self.batch is not None:
+            self.batch.sleep(self.batch_key)
+            return
+
+        self.sleeping = True
+        self.sleep_time = 0.0
+        self.__velocity.set(0.0, 0.0)
+
+    def wake(self):
+        if self.batch is not None:
+            self.batch.wake(self.batch_key)
+            return
+
+        self.sleeping = False
+        self.sleep_time = 0.0
@@ -1,5 +1,3 @@
-from typing import cast
-
 from hg.math import Vector2
 
 from .body import Body
@@ -7,8 +5,21 @@ from .body import Body
 
 def apply_gravity(body: Body, gravity_accel: Vector2, time: float):
     if body.mass > 0:
-        body.velocity += cast(Vector2, gravity_accel * time)
+        body.velocity.iadd_scaled(gravity_accel, time)
 
 
 def apply_velocity(body: Body, time: float):
-    body.position += cast(Vector2, body.velocity * time)
+    body.position.iadd_scaled(body.velocity, time)
+
+
+def update_sleep(body: Body, time: float, sleep_velocity: float, sleep_delay: float) -> bool:
+    # massless bodies aren't slowed down by anything, they only rest when
+    # they don't move at all
+    speed_squared = body.velocity.magnitude_squared()
+    if speed_squared < sleep_velocity * sleep_velocity and (body.mass > 0 or speed_squared == 0):
+        body.sleep_time += time
+        if body.sleep_time >= sleep_delay:
+            body.sleep()
+    else:
+        body.sleep_time = 0.0
+    return body.sleeping
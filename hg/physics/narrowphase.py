@@ -0,0 +1,74 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def find_contacts(pairs: np.ndarray, bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Test candidate pairs of axis-aligned boxes for overlaps.
+
+    `pairs` is an (m, 2) array of row indices into the (n, 4) `bounds` array
+    of (min_x, min_y, max_x, max_y) boxes. Returns the indices of overlapping
+    pairs, the contact normals pointing from the first box of each pair to
+    the second one, and the penetration depths along them.
+    """
+    a = bounds[pairs[:, 0]]
+    b = bounds[pairs[:, 1]]
+
+    overlap_x = np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0])
+    overlap_y = np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1])
+    hits = np.nonzero((overlap_x > 0) & (overlap_y > 0))[0]
+
+    a = a[hits]
+    b = b[hits]
+    overlap_x = overlap_x[hits]
+    overlap_y = overlap_y[hits]
+
+    # separate along the axis of least penetration, away from the center of
+    # the first box
+    along_x = overlap_x < overlap_y
+    delta = (b[:, 0:2] + b[:, 2:4]) - (a[:, 0:2] + a[:, 2:4])
+    sign = np.where(delta >= 0, 1.0, -1.0)
+
+    normals = np.zeros((len(hits), 2))
+    normals[along_x, 0] = sign[along_x, 0]
+    normals[~along_x, 1] = sign[~along_x, 1]
+    depths = np.where(along_x, overlap_x, overlap_y)
+
+    return hits, normals, depths
+
+
+def resolve_contacts(
+        position: np.ndarray,
+        velocity: np.ndarray,
+        mass: np.ndarray,
+        pairs: np.ndarray,
+        normals: np.ndarray,
+        depths: np.ndarray):
+    """
+    Push overlapping bodies apart and cancel their approaching velocities.
+
+    Bodies without mass are considered static and are never moved. All the
+    corrections are accumulated and applied at once, in place.
+    """
+    inv_mass = np.divide(1.0, mass, out=np.zeros_like(mass), where=mass > 0)
+    inv_a = inv_mass[pairs[:, 0]]
+    inv_b = inv_mass[pairs[:, 1]]
+    inv_sum = inv_a + inv_b
+    movable = inv_sum > 0
+
+    pairs = pairs[movable]
+    normals = normals[movable]
+    depths = depths[movable]
+    share_a = (inv_a[movable] / inv_sum[movable])[:, np.newaxis]
+    share_b = (inv_b[movable] / inv_sum[movable])[:, np.newaxis]
+
+    correction = normals * depths[:, np.newaxis]
+    np.add.at(position, pairs[:, 0], -correction * share_a)
+    np.add.at(position, pairs[:, 1], correction * share_b)
+
+    # perfectly inelastic response along the contact normal
+    relative = np.einsum('ij,ij->i', velocity[pairs[:, 1]] - velocity[pairs[:, 0]], normals)
+    approaching = np.minimum(relative, 0.0)[:, np.newaxis] * normals
+    np.add.at(velocity, pairs[:, 0], approaching * share_a)
+    np.add.at(velocity, pairs[:, 1], -approaching * share_b)
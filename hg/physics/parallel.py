@@ -0,0 +1,121 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .batch import BodyBatch, integrate_arrays
+
+# description of a shared array: shared memory block name, shape and dtype
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+# shared memory blocks attached by the current worker process, by name
+attached_blocks: Dict[str, SharedMemory] = {}
+
+
+def attach(spec: ArraySpec) -> np.ndarray:
+    name, shape, dtype = spec
+    block = attached_blocks.get(name)
+    if block is None:
+        block = attached_blocks[name] = SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def detach_stale(specs: Tuple[ArraySpec, ...]):
+    # blocks replaced by the batch growing are no longer referenced by specs
+    names = {name for name, _, _ in specs}
+    for name in [name for name in attached_blocks if name not in names]:
+        attached_blocks.pop(name).close()
+
+
+def integrate_chunk(
+        specs: Tuple[ArraySpec, ArraySpec, ArraySpec],
+        start: int,
+        stop: int,
+        gravity_accel: Tuple[float, float],
+        time: float):
+    detach_stale(specs)
+    position, velocity, mass = (attach(spec) for spec in specs)
+    integrate_arrays(position[start:stop], velocity[start:stop], mass[start:stop], gravity_accel, time)
+
+
+class SharedBodyBatch(BodyBatch):
+    """
+    Body batch with its state kept in shared memory and integrated in chunks
+    by a pool of worker processes.
+
+    Workers write the integration results directly into the shared arrays,
+    from which they're scattered to the batch targets without any copying
+    between processes.
+    """
+
+    SHARED = ('position', 'velocity', 'mass')
+
+    def __init__(
+            self,
+            capacity: int = 1024,
+            processes: Optional[int] = None,
+            chunk_size: int = 16384,
+            executor: Optional[Executor] = None):
+        self.__blocks: Dict[str, SharedMemory] = {}
+        self.__retired: List[SharedMemory] = []
+        super().__init__(capacity)
+
+        self.chunk_size = chunk_size
+        self.__own_executor = executor is None
+        self.__executor = executor or ProcessPoolExecutor(max_workers=processes)
+
+    def integrate(self, gravity_accel: Tuple[float, float], time: float):
+        n = self.awake
+        if n <= self.chunk_size:
+            super().integrate(gravity_accel, time)
+            return
+
+        specs = tuple(self.__spec(name) for name in self.SHARED)
+        futures = [
+            self.__executor.submit(
+                integrate_chunk, specs, start, min(start + self.chunk_size, n), gravity_accel, time)
+            for start in range(0, n, self.chunk_size)
+        ]
+        for future in futures:
+            future.result()
+
+    def allocate(self, name: str, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+        if name not in self.SHARED:
+            return super().allocate(name, shape, dtype)
+
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        block = SharedMemory(create=True, size=max(size, 1))
+        if name in self.__blocks:
+            self.__retired.append(self.__blocks[name])
+        self.__blocks[name] = block
+
+        array: np.ndarray = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array.fill(0)
+        return array
+
+    def release(self, name: str, array: np.ndarray):
+        if name not in self.SHARED:
+            return
+
+        # the replaced block can't be closed while the array still uses it, so
+        # just unlink it, workers detach from it on their next run
+        self.__retired[-1].unlink()
+
+    def close(self):
+        if self.__own_executor:
+            self.__executor.shutdown()
+
+        for name in self.SHARED:
+            setattr(self, name, None)
+        for block in self.__retired:
+            block.close()
+        for block in self.__blocks.values():
+            block.close()
+            block.unlink()
+        self.__retired.clear()
+        self.__blocks.clear()
+
+    def __spec(self, name: str) -> ArraySpec:
+        array = getattr(self, name)
+        return (self.__blocks[name].name, array.shape, array.dtype.str)
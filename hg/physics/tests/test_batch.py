@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+from hg.core.pool import ComponentPool
+from hg.math import Vector2
+
+from ..batch import BodyBatch
+from ..body import Body
+
+
+@dataclass
+class Point:
+    x: float = 0
+    y: float = 0
+
+
+def test_batch_integrate():
+    batch = BodyBatch(capacity=1)
+    falling = Point(0, 10)
+    static = Point(5, 5)
+    moving = Point(0, 0)
+
+    batch.add(1, Body(), falling)
+    batch.add(2, Body(mass=0.0), static)
+    batch.add(3, Body(mass=0.0, velocity=Vector2(1, 2)), moving)
+    assert len(batch) == 3
+
+    batch.gather()
+    batch.integrate((0.0, -5.0), 1.0)
+    batch.scatter()
+
+    # only bodies with mass are affected by gravity
+    assert (falling.x, falling.y) == (0, 5)
+    assert (static.x, static.y) == (5, 5)
+    assert (moving.x, moving.y) == (1, 2)
+
+
+def test_batch_remove():
+    batch = BodyBatch()
+    bodies = [Body() for _ in range(3)]
+    targets = [Point(i, 0) for i in range(3)]
+    for i, (body, target) in enumerate(zip(bodies, targets)):
+        batch.add(i, body, target)
+
+    batch.gather()
+    batch.integrate((0.0, 2.0), 0.5)
+
+    # removed bodies get their final state written back
+    batch.remove(0)
+    assert 0 not in batch
+    assert bodies[0].velocity.y == pytest.approx(1.0)
+    assert bodies[0].position.y == pytest.approx(0.5)
+
+    # the last row took the place of the removed one
+    assert batch.keys == [2, 1]
+    assert batch.targets == [targets[2], targets[1]]
+    assert batch.position[0].tolist() == [2, 0.5]
+
+    # bodies in the batch read and write their rows directly
+    assert bodies[2].position.x == 2
+    assert bodies[2].velocity.y == pytest.approx(1.0)
+    bodies[2].velocity.x = 3
+    bodies[2].mass = 0
+    assert batch.velocity[0].tolist() == [3, pytest.approx(1.0)]
+    assert batch.mass[0] == 0
+
+
+def test_batch_pooled_targets():
+    pool = ComponentPool(Point)
+    views = [pool.alloc(Point(i, 0)) for i in range(4)]
+
+    batch = BodyBatch()
+    for i, view in enumerate(views):
+        batch.add(i, Body(), view)
+    batch.remove(1)
+
+    # move the targets around directly in the pool columns, the batch should
+    # pick the changes up
+    pool.columns['x'] += 1
+
+    batch.gather()
+    batch.integrate((0.0, 1.0), 1.0)
+    batch.scatter()
+
+    assert [(v.x, v.y) for v in views] == [(1, 1), (2, 0), (3, 1), (4, 1)]
+
+    # mixing pooled and plain targets falls back to attribute access
+    plain = Point(0, 0)
+    batch.add(5, Body(), plain)
+    batch.gather()
+    batch.integrate((0.0, 1.0), 1.0)
+    batch.scatter()
+
+    assert (plain.x, plain.y) == (0, 1)
+    assert views[0].y == 3
+
+
+def test_batch_sleep():
+    batch = BodyBatch()
+    targets = [Point(i, 0) for i in range(4)]
+    bodies = [Body(mass=0.0) for _ in range(4)]
+    bodies[3].velocity = Vector2(0, 10)
+    for i, (body, target) in enumerate(zip(bodies, targets)):
+        batch.add(i, body, target)
+    assert batch.awake == 4
+
+    # the massless resting bodies fall asleep, the moving one doesn't
+    assert batch.update_sleep(0.5, 0.1, 1.0) == []
+    assert sorted(batch.update_sleep(0.5, 0.1, 1.0)) == [0, 1, 2]
+    assert batch.awake == 1
+    assert batch.keys[0] == 3
+    assert all(b.sleeping for b in bodies[:3])
+
+    # sleeping bodies are neither integrated nor scattered
+    targets[0].x = 100
+    batch.gather()
+    batch.integrate((0.0, 1.0), 1.0)
+    batch.scatter()
+    assert (targets[0].x, targets[0].y) == (100, 0)
+    assert (targets[3].x, targets[3].y) == (3, 10)
+
+    # writing to a sleeping body wakes it up
+    bodies[1].velocity.x = 1
+    assert batch.awake == 2
+    assert batch.velocity[batch.rows(np.array([1]))[0]].tolist() == [1, 0]
+    assert not bodies[1].sleeping
+    assert set(batch.keys[:2]) == {1, 3}
+
+    # removing bodies from both partitions keeps them consistent
+    batch.remove(3)
+    batch.remove(0)
+    assert batch.awake == 1
+    assert batch.keys == [1, 2]
+    batch.add(5, Body(), Point())
+    assert batch.awake == 2
+    assert batch.keys == [1, 5, 2]
@@ -1,7 +1,7 @@
 from hg.math import Vector2
 
 from ..body import Body
-from ..motion import apply_gravity, apply_velocity
+from ..motion import apply_gravity, apply_velocity, update_sleep
 
 
 def test_body_fall_by_gravity():
@@ -22,3 +22,25 @@ def test_massless_body_doesnt_fall():
 
     assert body.position.x == 0
     assert body.position.y == 0
+
+
+def test_body_sleep():
+    body = Body(velocity=Vector2(0.05, 0))
+
+    # slow bodies fall asleep after a delay
+    assert not update_sleep(body, 0.25, 0.1, 0.5)
+    assert update_sleep(body, 0.25, 0.1, 0.5)
+    assert body.sleeping
+    assert body.velocity.x == 0
+
+    # assigning a new state wakes the body up
+    body.velocity = Vector2(1, 0)
+    assert not body.sleeping
+
+    # fast bodies never sleep
+    for _ in range(10):
+        assert not update_sleep(body, 0.25, 0.1, 0.5)
+
+    body.sleep()
+    body.mass = 2
+    assert not body.sleeping
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from hg.math import Vector2
+
+from ..body import Body
+from ..narrowphase import find_contacts, resolve_contacts
+
+
+def test_body_aabb():
+    body = Body(position=Vector2(1, 2), size=Vector2(3, 4))
+    assert body.aabb == (1, 2, 4, 6)
+    assert Body().aabb == (0, 0, 0, 0)
+
+
+def test_find_contacts():
+    bounds = np.array([
+        [0, 0, 10, 10],
+        [8, 1, 18, 11],    # overlaps the first one mostly horizontally
+        [2, -9, 12, 1],    # overlaps the first one mostly vertically, from above
+        [10, 20, 20, 30],  # far away
+        [10, 0, 20, 10],   # touches the first one, but doesn't overlap
+    ], dtype=np.float64)
+    pairs = np.array([[0, 1], [0, 2], [0, 3], [0, 4]])
+
+    hits, normals, depths = find_contacts(pairs, bounds)
+    assert hits.tolist() == [0, 1]
+    assert normals.tolist() == [[1, 0], [0, -1]]
+    assert depths.tolist() == [2, 1]
+
+
+def test_resolve_contacts():
+    position = np.array([[0, 0], [8, 0], [0, 20], [0, 29]], dtype=np.float64)
+    velocity = np.array([[1, 0], [-1, 0], [0, 5], [0, 0]], dtype=np.float64)
+    mass = np.array([1, 1, 1, 0], dtype=np.float64)
+    pairs = np.array([[0, 1], [2, 3]])
+    normals = np.array([[1, 0], [0, 1]], dtype=np.float64)
+    depths = np.array([2, 1], dtype=np.float64)
+
+    resolve_contacts(position, velocity, mass, pairs, normals, depths)
+
+    # equal masses share the correction and stop
+    assert position[0].tolist() == [-1, 0]
+    assert position[1].tolist() == [9, 0]
+    assert velocity[0].tolist() == [0, 0]
+    assert velocity[1].tolist() == [0, 0]
+
+    # static bodies don't move, the dynamic one takes the whole correction
+    assert position[2].tolist() == [0, 19]
+    assert position[3].tolist() == [0, 29]
+    assert velocity[2].tolist() == pytest.approx([0, 0])
+    assert velocity[3].tolist() == [0, 0]
@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+from ..body import Body
+from ..batch import BodyBatch
+from ..parallel import SharedBodyBatch
+
+
+@dataclass
+class Point:
+    x: float = 0
+    y: float = 0
+
+
+@pytest.fixture
+def shared_batch():
+    batch = SharedBodyBatch(capacity=4, processes=2, chunk_size=8)
+    yield batch
+    batch.close()
+
+
+def test_shared_batch_matches_local(shared_batch):
+    local = BodyBatch(capacity=4)
+
+    # enough bodies to make the shared batch grow and split them in chunks
+    for i in range(50):
+        mass = 0.0 if i % 7 == 0 else 1.0
+        local.add(i, Body(mass=mass), Point(i, -i))
+        shared_batch.add(i, Body(mass=mass), Point(i, -i))
+
+    for _ in range(10):
+        for batch in (local, shared_batch):
+            batch.gather()
+            batch.integrate((0.0, 9.8), 0.1)
+            batch.scatter()
+
+    n = len(local)
+    assert np.array_equal(local.position[:n], shared_batch.position[:n])
+    assert np.array_equal(local.velocity[:n], shared_batch.velocity[:n])
+    assert [(t.x, t.y) for t in local.targets] == [(t.x, t.y) for t in shared_batch.targets]
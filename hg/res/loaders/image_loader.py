@@ -1,4 +1,5 @@
 import os
+from typing import Dict
 
 import sdl2
 
@@ -11,8 +12,14 @@ class ImageLoader(Loader):
 
     def __init__(self, sdl_renderer: sdl2.SDL_Renderer):
         self.__renderer = sdl_renderer
+        # images by absolute path, each loaded into a texture only once
+        self.__images: Dict[str, Image] = {}
 
     def load(self, path):
-        surface = sdl2.ext.load_image(path)
-        texture = sdl2.SDL_CreateTextureFromSurface(self.__renderer, surface)
-        return Image(os.path.basename(path), surface.w, surface.h, texture)
+        key = os.path.abspath(path)
+        image = self.__images.get(key)
+        if image is None:
+            surface = sdl2.ext.load_image(path)
+            texture = sdl2.SDL_CreateTextureFromSurface(self.__renderer, surface)
+            image = self.__images[key] = Image(os.path.basename(path), surface.w, surface.h, texture)
+        return image
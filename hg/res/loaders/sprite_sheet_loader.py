@@ -1,4 +1,5 @@
 import os
+from typing import Dict
 
 import inject
 from lxml import etree
@@ -17,7 +18,19 @@ class XMLSpriteSheetLoadError(Exception):
 
 class SpriteSheetLoader(Loader):
 
+    def __init__(self):
+        # sheets by absolute path, shared by all the sprites using them so
+        # that they can be drawn in batches of the same atlas
+        self.__sheets: Dict[str, SpriteSheet] = {}
+
     def load(self, path: str) -> SpriteSheet:
+        key = os.path.abspath(path)
+        sheet = self.__sheets.get(key)
+        if sheet is None:
+            sheet = self.__sheets[key] = self.__load(path)
+        return sheet
+
+    def __load(self, path: str) -> SpriteSheet:
         global spritesheet_schema
         if spritesheet_schema is None:
             schema_path = os.path.dirname(__file__)
@@ -29,3 +29,14 @@ def test_load_spritesheet():
         assert frame.y == y
         assert frame.w == w
         assert frame.h == h
+
+
+@pytest.mark.inject()
+def test_spritesheet_cache():
+    loader = SpriteSheetLoader()
+    path = os.path.dirname(__file__)
+    sheet = loader.load(os.path.join(path, 'test_sprite_sheet.xml'))
+
+    # sheets are loaded once per path
+    assert loader.load(os.path.join(path, '..', 'tests', 'test_sprite_sheet.xml')) is sheet
+    assert SpriteSheetLoader().load(os.path.join(path, 'test_sprite_sheet.xml')) is not sheet
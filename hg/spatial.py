@@ -0,0 +1,123 @@
+from collections import defaultdict
+from itertools import combinations
+from typing import DefaultDict, Dict, Generator, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# inclusive range of cells covered by a box: (min_x, min_y, max_x, max_y)
+CellRange = Tuple[int, int, int, int]
+
+# cell range covering no cells at all, for entries not inserted yet
+EMPTY_RANGE: CellRange = (1, 1, 0, 0)
+
+
+class SpatialHash:
+    """
+    Uniform grid mapping boxes to the grid cells they overlap, serving as
+    the physics broadphase and for culling sprites.
+
+    Entries are only moved between cells when the range of cells they cover
+    changes, and candidate pairs are only formed between entries sharing a
+    cell, which keeps both updates and pair searches near-linear.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.__cells: DefaultDict[Tuple[int, int], Set[int]] = defaultdict(set)
+        self.__ranges: Dict[int, CellRange] = {}
+
+    def cell_range(self, min_x: float, min_y: float, max_x: float, max_y: float) -> CellRange:
+        size = self.cell_size
+        return (int(min_x // size), int(min_y // size), int(max_x // size), int(max_y // size))
+
+    def update(self, key: int, min_x: float, min_y: float, max_x: float, max_y: float) -> bool:
+        new = self.cell_range(min_x, min_y, max_x, max_y)
+        old = self.__ranges.get(key, EMPTY_RANGE)
+        if new == old:
+            return False
+
+        self.__move(key, old, new)
+        return True
+
+    def update_many(self, keys: Sequence[int], bounds: np.ndarray, cells: np.ndarray):
+        """
+        Update the entries for given keys from an array of their bounds.
+
+        The `cells` array caches the cell ranges of the entries as of the
+        previous update, it is used to find the ones which moved to other
+        cells in a single vectorized step and is updated in place.
+        """
+        new = np.floor_divide(bounds, self.cell_size).astype(np.int64)
+        moved = np.nonzero(np.any(new != cells, axis=1))[0]
+        for row, new_range in zip(moved.tolist(), new[moved].tolist()):
+            key = keys[row]
+            self.__move(key, self.__ranges.get(key, EMPTY_RANGE), tuple(new_range))
+        cells[moved] = new[moved]
+
+    def remove(self, key: int):
+        self.__move(key, self.__ranges.get(key, EMPTY_RANGE), EMPTY_RANGE)
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> Set[int]:
+        found: Set[int] = set()
+        for cell in self.__iter_cells(self.cell_range(min_x, min_y, max_x, max_y)):
+            found.update(self.__cells.get(cell, ()))
+        return found
+
+    def pairs(self, keys: Optional[Iterable[int]] = None) -> Generator[Tuple[int, int], None, None]:
+        """
+        Get the candidate pairs of entries sharing a cell, as (lower key,
+        higher key) tuples, or only the ones involving given keys.
+
+        Limiting the search to the entries which moved keeps its cost
+        proportional to them rather than to all the entries.
+        """
+        # entries spanning multiple cells could meet more than once
+        seen: Set[Tuple[int, int]] = set()
+        if keys is None:
+            for cell_keys in self.__cells.values():
+                if len(cell_keys) < 2:
+                    continue
+                for pair in combinations(sorted(cell_keys), 2):
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+            return
+
+        for key in keys:
+            cell_range = self.__ranges.get(key)
+            if cell_range is None:
+                continue
+            for cell in self.__iter_cells(cell_range):
+                for other in self.__cells[cell]:
+                    if other == key:
+                        continue
+                    pair = (key, other) if key < other else (other, key)
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+    def __move(self, key: int, old: CellRange, new: CellRange):
+        for cell in self.__iter_cells(old):
+            keys = self.__cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self.__cells[cell]
+
+        for cell in self.__iter_cells(new):
+            self.__cells[cell].add(key)
+
+        if new == EMPTY_RANGE:
+            self.__ranges.pop(key, None)
+        else:
+            self.__ranges[key] = new
+
+    @staticmethod
+    def __iter_cells(cell_range: CellRange) -> List[Tuple[int, int]]:
+        min_x, min_y, max_x, max_y = cell_range
+        return [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+    def __len__(self) -> int:
+        return len(self.__ranges)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.__ranges
@@ -0,0 +1,55 @@
+import numpy as np
+
+from ..math import Vector2, Vector2Array
+
+
+def test_vector_operators():
+    a = Vector2(1, 2)
+    b = Vector2(3, 4)
+
+    assert a + b == Vector2(4, 6)
+    assert b - a == Vector2(2, 2)
+    assert a * 2 == Vector2(2, 4)
+    assert 2 * a == Vector2(2, 4)
+    assert -a == Vector2(-1, -2)
+    assert a.dot(b) == 11
+    assert Vector2(3, 4).magnitude() == 5
+    assert tuple(a) == (1, 2)
+
+    # operators don't touch the operands
+    assert a == Vector2(1, 2)
+    assert b == Vector2(3, 4)
+
+
+def test_vector_in_place():
+    a = Vector2(1, 2)
+    same = a
+
+    a += Vector2(1, 1)
+    a -= Vector2(0, 2)
+    a *= 3
+    a.iadd_scaled(Vector2(1, -1), 0.5)
+
+    assert a is same
+    assert a == Vector2(6.5, 2.5)
+    assert a.set(0, 0) is same
+    assert a == Vector2()
+
+
+def test_vector_array():
+    positions = Vector2Array(3)
+    velocities = Vector2Array(data=np.array([[1.0, 0.0], [0.0, 1.0], [2.0, 2.0]]))
+
+    positions.iadd_scaled(Vector2(0, -1), 2.0)
+    positions.iadd_scaled(velocities, 0.5)
+    positions.iadd_scaled(velocities, np.array([0.0, 0.0, 1.0]))
+
+    assert len(positions) == 3
+    assert positions[0] == Vector2(0.5, -2.0)
+    assert positions[1] == Vector2(0.0, -1.5)
+    assert positions[2] == Vector2(3.0, 1.0)
+    assert positions.x.tolist() == [0.5, 0.0, 3.0]
+
+    positions[1] = Vector2(7, 8)
+    positions *= 2
+    assert positions[1] == Vector2(14, 16)
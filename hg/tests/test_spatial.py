@@ -0,0 +1,66 @@
+from itertools import combinations
+
+import numpy as np
+
+from ..spatial import EMPTY_RANGE, SpatialHash
+
+
+def test_spatial_hash_update():
+    grid = SpatialHash(cell_size=10)
+
+    assert grid.update(1, 1, 1, 2, 2)
+    assert grid.update(2, 5, 5, 6, 6)
+    assert grid.update(3, 25, 25, 26, 26)
+
+    # spanning multiple cells
+    assert grid.update(4, 8, 8, 22, 12)
+
+    # moving within the same cells is a no-op
+    assert not grid.update(1, 3, 3, 4, 4)
+
+    assert sorted(grid.pairs()) == [(1, 2), (1, 4), (2, 4)]
+    assert grid.query(0, 0, 9, 9) == {1, 2, 4}
+    assert grid.query(20, 10, 30, 30) == {3, 4}
+
+    grid.update(3, 15, 5, 16, 6)
+    assert sorted(grid.pairs()) == [(1, 2), (1, 4), (2, 4), (3, 4)]
+
+    # pairs can be limited to the ones involving given entries
+    assert sorted(grid.pairs([3])) == [(3, 4)]
+    assert sorted(grid.pairs([1, 2, 5])) == [(1, 2), (1, 4), (2, 4)]
+
+    grid.remove(4)
+    assert 4 not in grid
+    assert len(grid) == 3
+    assert sorted(grid.pairs()) == [(1, 2)]
+    assert grid.query(-100, -100, 100, 100) == {1, 2, 3}
+
+
+def test_spatial_hash_update_many():
+    grid = SpatialHash(cell_size=1)
+    keys = list(range(100))
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0, 10, size=(100, 2))
+    bounds = np.hstack((positions, positions + 0.5))
+    cells = np.tile(EMPTY_RANGE, (100, 1))
+
+    grid.update_many(keys, bounds, cells)
+    assert len(grid) == 100
+
+    # candidate pairs must include all actually overlapping boxes
+    def overlapping():
+        for a, b in combinations(keys, 2):
+            if np.all(bounds[a, :2] <= bounds[b, 2:]) and np.all(bounds[b, :2] <= bounds[a, 2:]):
+                yield (a, b)
+
+    pairs = set(grid.pairs())
+    assert set(overlapping()).issubset(pairs)
+    assert set(grid.pairs(keys[:10])) == {pair for pair in pairs if pair[0] < 10 or pair[1] < 10}
+
+    # only entries which actually changed cells are moved
+    bounds[0] += 100
+    moved_cells = cells.copy()
+    grid.update_many(keys, bounds, moved_cells)
+    assert grid.query(100, 100, 111, 111) == {0}
+    changed = np.nonzero(np.any(moved_cells != cells, axis=1))[0]
+    assert changed.tolist() == [0]
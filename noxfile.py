@@ -1,3 +1,6 @@
+import glob
+import os
+
 import nox
 
 
@@ -5,6 +8,9 @@ PYTEST_VER = 'pytest>=5.3.5'
 PYTEST_MOCK_VER = 'pytest-mock>=2.0.0'
 FLAKE8_VER = 'flake8>=3.7.9'
 COVERAGE_VER = 'coverage>=5.0.3'
+PYTEST_BENCHMARK_VER = 'pytest-benchmark>=3.2.3'
+
+BENCHMARK_ARGS = ('hg/benchmarks', '-o', 'python_files=bench_*.py', '--benchmark-storage=.benchmarks')
 
 
 @nox.session
@@ -27,3 +33,27 @@ def coverage(session):
     session.install('-r', 'requirements.txt')
     session.run('coverage', 'run', '--source', 'hg', '-m', 'pytest')
     session.run('coverage', 'html', '-d', 'coverage')
+
+
+@nox.session
+def benchmarks(session):
+    """Run the benchmarks and report regressions against the latest baseline."""
+    session.install('-r', 'requirements.txt')
+    session.install(PYTEST_BENCHMARK_VER)
+
+    baselines = sorted(glob.glob(os.path.join('.benchmarks', '*', '*_baseline.json')), key=os.path.basename)
+    if baselines:
+        compare = (f'--benchmark-compare={baselines[-1]}', '--benchmark-compare-fail=mean:20%')
+    else:
+        session.log('No baseline saved yet, run the benchmarks_baseline session first to compare against one')
+        compare = ()
+
+    session.run('pytest', *BENCHMARK_ARGS, *compare, *session.posargs)
+
+
+@nox.session
+def benchmarks_baseline(session):
+    """Run the benchmarks and save the results as the new baseline."""
+    session.install('-r', 'requirements.txt')
+    session.install(PYTEST_BENCHMARK_VER)
+    session.run('pytest', *BENCHMARK_ARGS, '--benchmark-save=baseline', *session.posargs)
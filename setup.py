@@ -14,10 +14,11 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type='text/markdown',
     url='https://github.com/V0idExp/mercury',
-    packages=setuptools.find_packages(exclude=['*.examples', '*.tests']),
+    packages=setuptools.find_packages(exclude=['*.benchmarks', '*.examples', '*.tests']),
     install_requires=[
         'Inject>=4.1.1',
         'lxml>=4.5.0',
+        'numpy>=1.18.1',
         'PySDL2>=0.9.7',
         'pysdl2-dll>=2.0.10',
     ],
@@ -31,5 +32,5 @@ setuptools.setup(
         'Topic :: Multimedia',
         'Typing :: Typed',
     ],
-    python_requires='>=3.7',
+    python_requires='>=3.8',
 )